@@ -0,0 +1,135 @@
+import os
+import shutil
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from fileio import atomic_open, source_entry
+from textnode import TextType
+
+# Hex digits of the content hash put in asset filenames
+HASH_LENGTH = 12
+
+# ioctl cloning one file's extents into another, from <linux/fs.h>
+_FICLONE = 0x40049409
+
+# Outcome of copy_assets: output paths placed, left unchanged and deleted
+AssetResult = namedtuple("AssetResult", ["placed", "skipped", "removed"])
+
+def hashed_name(relative, digest):
+    #Maps images/cat.png to images/cat.<first HASH_LENGTH digits of digest>.png
+    root, extension = os.path.splitext(relative)
+    return f"{root}.{digest[:HASH_LENGTH]}{extension}"
+
+def find_assets(static_dir):
+    #Returns the path relative to static_dir of every file under it, in a stable order
+    assets = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        relative_root = os.path.relpath(root, static_dir)
+        for name in sorted(files):
+            assets.append(name if relative_root == "." else os.path.join(relative_root, name))
+    return assets
+
+def place_file(source_path, dest_path, link=True):
+    #Puts the contents of source_path at dest_path, sharing data with the source where the
+    #filesystem allows: a hardlink (when link is True), then a reflink, then a plain copy.
+    #The destination is replaced atomically. Returns "link", "reflink" or "copy".
+
+    if link:
+        try:
+            if os.path.samestat(os.stat(source_path), os.stat(dest_path)):
+                return "link"
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        tmp = f"{dest_path}.{os.getpid()}.tmp"
+        try:
+            os.link(source_path, tmp)
+        except OSError:
+            pass
+        else:
+            os.replace(tmp, dest_path)
+            # Renaming over another link to the same file does nothing and leaves tmp behind
+            _remove(tmp)
+            return "link"
+
+    with open(source_path, "rb") as source, atomic_open(dest_path, "wb") as dest:
+        if fcntl is not None:
+            try:
+                fcntl.ioctl(dest.fileno(), _FICLONE, source.fileno())
+                return "reflink"
+            except OSError:
+                pass
+        shutil.copyfileobj(source, dest, 1 << 20)
+    return "copy"
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def copy_assets(static_dir, output_dir, old_entries, link=True):
+    #Mirrors static_dir into output_dir. Every file is placed under its own name and under
+    #a content-hashed name (see hashed_name) that can be cached forever.
+    #Only the plain name may be hardlinked: a hashed copy sharing the source's inode would change
+    #with it when the source is edited in place, so it is reflinked or copied instead.
+    #Files whose hash and outputs are unchanged since old_entries are skipped,
+    #and outputs of files no longer in static_dir are deleted.
+    #Returns the new manifest entries and an AssetResult.
+
+    entries = {}
+    placed = []
+    skipped = []
+    removed = []
+
+    for relative in find_assets(static_dir):
+        source = os.path.join(static_dir, relative)
+        old_entry = old_entries.get(relative)
+        entry = source_entry(source, old_entry)
+        entry["output"] = hashed_name(relative, entry["hash"])
+        entries[relative] = entry
+
+        dests = [os.path.join(output_dir, relative), os.path.join(output_dir, entry["output"])]
+        if old_entry and old_entry["hash"] == entry["hash"] and all(os.path.exists(dest) for dest in dests):
+            skipped.extend(dests)
+            continue
+        place_file(source, dests[0], link)
+        place_file(source, dests[1], link=False)
+        placed.extend(dests)
+        if old_entry and old_entry["output"] != entry["output"]:
+            _remove(os.path.join(output_dir, old_entry["output"]))
+
+    for relative, old_entry in old_entries.items():
+        if relative not in entries:
+            for output in (relative, old_entry["output"]):
+                dest = os.path.join(output_dir, output)
+                _remove(dest)
+                removed.append(dest)
+
+    return entries, AssetResult(placed, skipped, removed)
+
+def asset_urls(entries):
+    #Returns {"/images/cat.png": "/images/cat.<hash>.png"} for the assets in manifest entries
+    return {
+        "/" + relative.replace(os.sep, "/"): "/" + entry["output"].replace(os.sep, "/")
+        for relative, entry in entries.items()
+    }
+
+def asset_parser(inline_parser, urls):
+    #Wraps an inline parser so images whose URL names a static asset, e.g. "/images/cat.png",
+    #point at its content-hashed copy instead. Other URLs are left as written.
+    if not urls:
+        return inline_parser
+
+    def parse(text):
+        nodes = inline_parser(text)
+        for node in nodes:
+            if node.text_type is TextType.IMAGE and node.url in urls:
+                node.url = urls[node.url]
+        return nodes
+    return parse
@@ -0,0 +1,436 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from textnode import TextNode, TextType, text_node_to_html_node
+from htmlnode import LeafNode, ParentNode
+from delimiter import split_nodes_image, split_nodes_link, text_to_spannodes, text_to_textnodes, text_to_textnodes_batch
+from extractlinks import extract_markdown_images, extract_markdown_links
+from blocks import iter_blocks, markdown_to_html_node
+from flatdoc import FlatDocument
+from parsecache import ParseCache
+from rendercache import RenderCache
+
+
+def best_time(func, *args, repeat=5):
+    # Returns the fastest of repeat runs, in seconds
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def link_paragraph(count, image=False):
+    # Builds a single paragraph with count links (or images) separated by filler text
+    prefix = "!" if image else ""
+    return " filler text ".join(
+        f"{prefix}[item {i}](https://example.com/page/{i})" for i in range(count)
+    )
+
+
+def bench_split_scaling(sizes=(250, 500, 1000, 2000, 4000, 8000)):
+    # Times split_nodes_link and split_nodes_image on paragraphs with a growing number of matches.
+    # Linear scaling shows up as a flat time per match column.
+    print("split scaling (one paragraph, N matches)")
+    print(f"{'function':<20}{'N':>8}{'total ms':>12}{'us/match':>12}")
+    for func, image in ((split_nodes_link, False), (split_nodes_image, True)):
+        for count in sizes:
+            nodes = [TextNode(link_paragraph(count, image), TextType.NORMAL)]
+            elapsed = best_time(func, nodes)
+            print(f"{func.__name__:<20}{count:>8}{elapsed * 1000:>12.2f}{elapsed / count * 1e6:>12.2f}")
+
+
+def recursive_to_html(node):
+    # The recursive ParentNode.to_html the iterative renderer replaced, kept as a reference
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    return f"<{node.tag}{node.props_to_html()}>{''.join(recursive_to_html(child) for child in node.children)}</{node.tag}>"
+
+
+def wide_tree(width):
+    # A div with width paragraphs of mixed leaves
+    return ParentNode("div", [
+        ParentNode("p", [
+            LeafNode(None, "Some text "),
+            LeafNode("b", "bold"),
+            LeafNode("a", "link", {"href": f"https://example.com/{i}"}),
+        ])
+        for i in range(width)
+    ])
+
+
+def deep_tree(depth):
+    # depth nested blockquotes around a single leaf
+    node = LeafNode("p", "deep")
+    for _ in range(depth):
+        node = ParentNode("blockquote", [LeafNode(None, "quote "), node])
+    return node
+
+
+def bench_render():
+    # Compares the iterative renderer with the recursive reference on wide and deep trees
+    print("render (ParentNode.to_html)")
+    print(f"{'tree':<16}{'recursive ms':>14}{'iterative ms':>14}")
+    for name, root in (("wide 20000", wide_tree(20000)), ("deep 300", deep_tree(300))):
+        assert recursive_to_html(root) == root.to_html()
+        old = best_time(recursive_to_html, root)
+        new = best_time(root.to_html)
+        print(f"{name:<16}{old * 1000:>14.2f}{new * 1000:>14.2f}")
+    root = deep_tree(100000)
+    elapsed = best_time(root.to_html, repeat=1)
+    print(f"{'deep 100000':<16}{'RecursionError':>14}{elapsed * 1000:>14.2f}")
+
+
+def concat_props_to_html(node):
+    # The uncached, unescaped props_to_html the cached version replaced
+    props_html = ""
+    for prop in node.props:
+        props_html += f' {prop}="{node.props[prop]}"'
+    return props_html
+
+
+def bench_props():
+    # Renders the props of a navigation sidebar repeated on many pages
+    print("props (props_to_html, 50-link sidebar x 1000 pages)")
+    sidebar = [
+        LeafNode("a", f"Section {i}", {"href": f"/docs/section-{i}/index.html", "class": "nav-link"})
+        for i in range(50)
+    ]
+    def render(func):
+        for _ in range(1000):
+            for link in sidebar:
+                func(link)
+    old = best_time(render, concat_props_to_html)
+    new = best_time(render, LeafNode.props_to_html)
+    print(f"{'concatenated ms':<18}{old * 1000:>10.2f}")
+    print(f"{'cached ms':<18}{new * 1000:>10.2f}")
+
+
+class DictTextNode():
+    # TextNode as it was before __slots__, kept as a reference for the memory benchmark
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode():
+    # LeafNode as it was before __slots__
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+def bytes_per_node(factory, count=100000):
+    # Average traced allocation per instance; the shared text and props are created up front
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+
+def bench_memory():
+    # Reports bytes per node for the dict-based and slotted node classes
+    print("memory (bytes per node)")
+    print(f"{'class':<12}{'__dict__':>12}{'__slots__':>12}")
+    text = "some text"
+    rows = (
+        ("TextNode", lambda: DictTextNode(text, TextType.NORMAL), lambda: TextNode(text, TextType.NORMAL)),
+        ("LeafNode", lambda: DictLeafNode("b", text), lambda: LeafNode("b", text)),
+    )
+    for name, old, new in rows:
+        print(f"{name:<12}{bytes_per_node(old):>12.1f}{bytes_per_node(new):>12.1f}")
+
+
+def traced_bytes(func):
+    # Bytes still allocated by func's result, measured with tracemalloc
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def bench_spans():
+    # Memory held by the leaves of a 2MB document, with copied text and with spans into the source
+    print("spans (leaves of a 2MB document)")
+    print(f"{'corpus':<8}{'nodes':<14}{'MB held':>10}{'x source':>10}{'ms':>10}")
+    for corpus, format_density in (("plain", 0.0), ("mixed", 0.1)):
+        paragraphs = synthetic_paragraphs(2_000_000, link_density=0.0, format_density=format_density)
+        size = sum(len(paragraph) for paragraph in paragraphs)
+        for name, parse in (("TextNode", text_to_textnodes), ("SpanTextNode", text_to_spannodes)):
+            def convert():
+                return [[text_node_to_html_node(node) for node in parse(p)] for p in paragraphs]
+            held = traced_bytes(convert)
+            elapsed = best_time(convert, repeat=3)
+            print(f"{corpus:<8}{name:<14}{held / 1e6:>10.2f}{held / size:>10.2f}{elapsed * 1000:>10.2f}")
+
+
+def short_items(count, format_density, seed=0):
+    # Builds count list-item or table-cell sized strings of 1 to 6 words
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        words = []
+        for i in range(rng.randint(1, 6)):
+            word = rng.choice(WORDS)
+            roll = rng.random()
+            if roll < format_density / 4:
+                word = f"[{word}](/{word}/{i})"
+            elif roll < format_density:
+                delimiter = rng.choice(("**", "_", "`"))
+                word = f"{delimiter}{word}{delimiter}"
+            words.append(word)
+        items.append(" ".join(words))
+    return items
+
+
+def bench_batch():
+    # One text_to_textnodes call per string against one text_to_textnodes_batch call for all of them
+    print("batch (50000 strings)")
+    print(f"{'corpus':<18}{'per call ms':>14}{'batch ms':>12}{'speedup':>10}")
+    cases = (
+        ("short plain", short_items(50000, 0.0)),
+        ("short mixed", short_items(50000, 0.1)),
+        ("short dense", short_items(50000, 0.4)),
+        ("paragraphs", synthetic_paragraphs(50000 * 300)[:50000]),
+    )
+    for corpus, items in cases:
+        assert text_to_textnodes_batch(items) == [text_to_textnodes(item) for item in items]
+        single = best_time(lambda: [text_to_textnodes(item) for item in items], repeat=3)
+        batch = best_time(text_to_textnodes_batch, items, repeat=3)
+        print(f"{corpus:<18}{single * 1000:>14.2f}{batch * 1000:>12.2f}{single / batch:>10.2f}")
+
+
+def bench_flat():
+    # Node objects against the flat arrays of FlatDocument for a 4MB document: parse and render time, memory held
+    print("flat (4MB document)")
+    print(f"{'corpus':<8}{'form':<14}{'ms':>10}{'MB held':>10}")
+    for corpus, format_density in (("plain", 0.0), ("mixed", 0.1), ("dense", 0.3)):
+        markdown = "\n\n".join(synthetic_paragraphs(4_000_000, format_density=format_density))
+        forms = (
+            ("nodes", lambda: markdown_to_html_node(markdown)),
+            ("FlatDocument", lambda: FlatDocument.from_markdown(markdown)),
+        )
+        for name, parse in forms:
+            elapsed = best_time(lambda: parse().to_html(), repeat=3)
+            print(f"{corpus:<8}{name:<14}{elapsed * 1000:>10.2f}{traced_bytes(parse) / 1e6:>10.2f}")
+
+
+def bench_rendercache():
+    # 400 pages rendered one by one and through a RenderCache, with and without blocks shared by
+    # every page (a 40-link navigation list twice and a note). Inline text goes through a ParseCache
+    # in both, as in a build.
+    print("rendercache (400 pages)")
+    print(f"{'corpus':<10}{'uncached ms':>14}{'cached ms':>12}{'speedup':>10}")
+    nav = "\n".join(f"- [Section {i}](/section/{i}.html)" for i in range(40))
+    note = "> **Note:** this page is generated, edit the _source_ instead. See [docs](/docs.html)."
+    paragraphs = synthetic_paragraphs(3_000_000)
+    for corpus, header, footer in (("shared", f"{nav}\n\n{note}\n\n", f"\n\n{nav}"), ("unique", "", "")):
+        pages = [header + "\n\n".join(paragraphs[i * 5:(i + 1) * 5]) + footer for i in range(400)]
+        parse = ParseCache().text_to_textnodes
+        uncached = best_time(lambda: [markdown_to_html_node(page, parse).to_html() for page in pages], repeat=3)
+        def cached():
+            cache = RenderCache()
+            return ["".join(cache.iter_markdown_html(page, parse)) for page in pages]
+        elapsed = best_time(cached, repeat=3)
+        print(f"{corpus:<10}{uncached * 1000:>14.2f}{elapsed * 1000:>12.2f}{uncached / elapsed:>10.2f}")
+
+
+WORDS = (
+    "the site generator renders markdown pages into html with links images and "
+    "formatted text for documentation changelogs and blog posts across many sections"
+).split()
+
+
+def synthetic_paragraphs(size, link_density=0.05, format_density=0.1, seed=0):
+    # Builds paragraphs totalling about size characters.
+    # Each word is turned into a link or image with link_density,
+    # and wrapped in bold, italic or code with format_density.
+    rng = random.Random(seed)
+    paragraphs = []
+    total = 0
+    while total < size:
+        words = []
+        for i in range(rng.randint(20, 80)):
+            word = rng.choice(WORDS)
+            roll = rng.random()
+            if roll < link_density:
+                prefix = "!" if rng.random() < 0.2 else ""
+                word = f"{prefix}[{word}](https://example.com/{word}/{i})"
+            elif roll < link_density + format_density:
+                delimiter = rng.choice(("**", "_", "`"))
+                word = f"{delimiter}{word}{delimiter}"
+            words.append(word)
+        paragraph = " ".join(words)
+        paragraphs.append(paragraph)
+        total += len(paragraph)
+    return paragraphs
+
+
+def directory_paragraphs(path):
+    # Collects the paragraph bodies of every markdown file under path, the real-world corpus
+    paragraphs = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".md"):
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    for block_type, lines in iter_blocks(f):
+                        if block_type.value == "paragraph":
+                            paragraphs.append(" ".join(lines))
+    return paragraphs
+
+
+def corpora(corpus_dirs):
+    # Named corpora of varying size and link/format density
+    result = {
+        "small-plain": synthetic_paragraphs(10_000, 0.0, 0.0),
+        "small-mixed": synthetic_paragraphs(10_000),
+        "medium-mixed": synthetic_paragraphs(200_000),
+        "medium-links": synthetic_paragraphs(200_000, link_density=0.3, format_density=0.05),
+        "large-mixed": synthetic_paragraphs(2_000_000),
+    }
+    for path in corpus_dirs:
+        result[os.path.basename(os.path.normpath(path))] = directory_paragraphs(path)
+    return result
+
+
+def measure_stages(paragraphs, repeat=3):
+    # Times each hot path separately on a corpus.
+    # Returns {stage: {"seconds", "mb_s", "nodes_s"}}, where mb_s is input megabytes per second
+    # and nodes_s is the number of nodes (or matches) produced or consumed per second.
+    size = sum(len(paragraph) for paragraph in paragraphs)
+    text_nodes = [[TextNode(paragraph, TextType.NORMAL)] for paragraph in paragraphs]
+    parsed = [text_to_textnodes(paragraph) for paragraph in paragraphs]
+    flat = [node for nodes in parsed for node in nodes]
+    flat_size = sum(len(node.text) for node in flat)
+    tree = ParentNode("div", [
+        ParentNode("p", [text_node_to_html_node(node) for node in nodes])
+        for nodes in parsed if nodes
+    ])
+    html_size = len(tree.to_html())
+
+    def count_nodes(result):
+        return sum(len(item) for item in result)
+
+    stages = (
+        ("text_to_textnodes", lambda: [text_to_textnodes(p) for p in paragraphs], size, count_nodes),
+        ("split_nodes_image", lambda: [split_nodes_image(n) for n in text_nodes], size, count_nodes),
+        ("split_nodes_link", lambda: [split_nodes_link(n) for n in text_nodes], size, count_nodes),
+        ("extract_markdown_images", lambda: [extract_markdown_images(p) for p in paragraphs], size, count_nodes),
+        ("extract_markdown_links", lambda: [extract_markdown_links(p) for p in paragraphs], size, count_nodes),
+        ("text_node_to_html_node", lambda: [text_node_to_html_node(n) for n in flat], flat_size, len),
+        ("ParentNode.to_html", tree.to_html, html_size, lambda result: len(flat) + len(tree.children) + 1),
+    )
+
+    results = {}
+    for name, func, megabytes, counter in stages:
+        count = counter(func())
+        elapsed = max(best_time(func, repeat=repeat), 1e-9)
+        results[name] = {
+            "seconds": elapsed,
+            "mb_s": megabytes / elapsed / 1e6,
+            "nodes_s": count / elapsed,
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Returns (corpus, stage, ratio) for every stage more than threshold slower than the baseline
+    regressions = []
+    for corpus, stages in results.items():
+        for stage, result in stages.items():
+            old = baseline.get(corpus, {}).get(stage)
+            if old is None:
+                continue
+            ratio = result["seconds"] / old["seconds"]
+            if ratio > 1 + threshold:
+                regressions.append((corpus, stage, ratio))
+    return regressions
+
+
+def bench_hotpaths(args):
+    # Throughput of each inline parsing and rendering hot path on every corpus,
+    # optionally saved as or compared against a stored baseline
+    results = {}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print("hot paths")
+    header = f"{'corpus':<14}{'stage':<26}{'ms':>10}{'MB/s':>10}{'nodes/s':>14}"
+    print(header + (f"{'vs base':>10}" if baseline else ""))
+    for corpus, paragraphs in corpora(args.corpus).items():
+        if not paragraphs:
+            continue
+        results[corpus] = measure_stages(paragraphs)
+        for stage, result in results[corpus].items():
+            line = f"{corpus:<14}{stage:<26}{result['seconds'] * 1000:>10.2f}{result['mb_s']:>10.2f}{result['nodes_s']:>14,.0f}"
+            old = baseline.get(corpus, {}).get(stage) if baseline else None
+            if old:
+                line += f"{result['seconds'] / old['seconds']:>9.2f}x"
+            print(line)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for corpus, stage, ratio in regressions:
+            print(f"REGRESSION {corpus} {stage}: {ratio:.2f}x the baseline time")
+        return 1 if regressions else 0
+    return 0
+
+
+BENCHMARKS = {
+    "split": lambda args: bench_split_scaling(),
+    "render": lambda args: bench_render(),
+    "memory": lambda args: bench_memory(),
+    "props": lambda args: bench_props(),
+    "hotpaths": bench_hotpaths,
+    "spans": lambda args: bench_spans(),
+    "batch": lambda args: bench_batch(),
+    "flat": lambda args: bench_flat(),
+    "rendercache": lambda args: bench_rendercache(),
+}
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks for the parsing and rendering hot paths")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--corpus", action="append", default=[], help="directory of markdown files to add as a corpus")
+    parser.add_argument("--baseline", help="JSON results to compare the hot paths against")
+    parser.add_argument("--save-baseline", help="write the hot path results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    status = 0
+    for name in args.names or list(BENCHMARKS):
+        status = BENCHMARKS[name](args) or status
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,178 @@
+import re
+import time
+from enum import Enum
+
+from textnode import TextNode, TextType, text_node_to_html_node
+from htmlnode import LeafNode, ParentNode
+from delimiter import text_to_textnodes
+import profiling
+from profiling import instrument
+
+class BlockType(Enum):
+    #Enumerator for block types
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+_HEADING_RE = re.compile(r"(#{1,6}) ")
+_ORDERED_ITEM_RE = re.compile(r"(\d+)\. ")
+_FENCE = "```"
+
+def iter_lines(source):
+    #Yields the lines of a string or of an iterable of lines (e.g. an open file), without line endings.
+    #Strings are walked with str.find so the document is never split into a list.
+
+    if isinstance(source, str):
+        start = 0
+        while True:
+            end = source.find("\n", start)
+            if end == -1:
+                yield source[start:].rstrip("\r")
+                return
+            yield source[start:end].rstrip("\r")
+            start = end + 1
+    else:
+        for line in source:
+            yield line.rstrip("\r\n")
+
+def block_to_block_type(lines):
+    #Classifies the lines of one block
+
+    if not isinstance(lines, list) or lines == []:
+        raise ValueError("lines must be a non-empty list")
+
+    first = lines[0]
+    if first.startswith(_FENCE):
+        return BlockType.CODE
+    if _HEADING_RE.match(first):
+        return BlockType.HEADING
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") or line.startswith("* ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    for number, line in enumerate(lines, 1):
+        match = _ORDERED_ITEM_RE.match(line)
+        if match is None or int(match.group(1)) != number:
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+def iter_blocks(source):
+    #Yields (BlockType, lines) for each block of a markdown document, reading it line by line.
+    #Blocks are separated by blank lines, except inside fenced code blocks.
+    #Only the lines of the current block are held in memory.
+
+    lines = []
+    in_code = False
+
+    for line in iter_lines(source):
+        if in_code:
+            lines.append(line)
+            if line.strip().startswith(_FENCE):
+                yield BlockType.CODE, lines
+                lines = []
+                in_code = False
+            continue
+
+        stripped = line.strip()
+        if stripped == "":
+            if lines:
+                yield block_to_block_type(lines), lines
+                lines = []
+            continue
+
+        if not lines and stripped.startswith(_FENCE):
+            if len(stripped) > 2 * len(_FENCE) - 1 and stripped.endswith(_FENCE):
+                yield BlockType.CODE, [stripped]
+            else:
+                lines = [line]
+                in_code = True
+            continue
+
+        lines.append(stripped)
+
+    if lines:
+        yield (BlockType.CODE if in_code else block_to_block_type(lines)), lines
+
+def _inline_children(text, inline_parser):
+    #Converts inline markdown into HTML leaf nodes.
+    #The conversion is recorded as one "convert" call per text here rather than by wrapping
+    #text_node_to_html_node, which runs once per node and would pay for the wrapper even unprofiled.
+    nodes = inline_parser(text)
+    profiler = profiling.active()
+    if profiler is None:
+        children = [text_node_to_html_node(node) for node in nodes]
+    else:
+        start = time.perf_counter()
+        children = [text_node_to_html_node(node) for node in nodes]
+        profiler.record("convert", time.perf_counter() - start, len(children))
+    if children == []:
+        return [LeafNode(None, "")]
+    return children
+
+def _code_text(lines):
+    #Returns the contents of a fenced code block without its fences
+    if len(lines) == 1:
+        return lines[0][len(_FENCE):-len(_FENCE)]
+    body = lines[1:]
+    if body and body[-1].strip().startswith(_FENCE):
+        body = body[:-1]
+    return "".join(line + "\n" for line in body)
+
+def block_inline_texts(block_type, lines):
+    #Returns (tag, item tag, texts) for a block other than code: the texts are the inline markdown
+    #bodies of the block, each wrapped in the item tag when it is not None (list items)
+
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return "p", None, [" ".join(lines)]
+        case BlockType.HEADING:
+            text = " ".join(lines)
+            level = len(_HEADING_RE.match(text).group(1))
+            return f"h{level}", None, [text[level + 1:]]
+        case BlockType.QUOTE:
+            return "blockquote", None, [" ".join(line[1:].strip() for line in lines)]
+        case BlockType.UNORDERED_LIST:
+            return "ul", "li", [line[2:] for line in lines]
+        case BlockType.ORDERED_LIST:
+            return "ol", "li", [line[_ORDERED_ITEM_RE.match(line).end():] for line in lines]
+        case _:
+            raise ValueError("Invalid block type")
+
+def block_to_html_node(block_type, lines, inline_parser=text_to_textnodes):
+    #Converts one block into an HTML node, running the inline parser only on the block body
+
+    if block_type is BlockType.CODE:
+        code = text_node_to_html_node(TextNode(_code_text(lines), TextType.CODE))
+        return ParentNode("pre", [code])
+    tag, item_tag, texts = block_inline_texts(block_type, lines)
+    if item_tag is None:
+        return ParentNode(tag, _inline_children(texts[0], inline_parser))
+    return ParentNode(tag, [ParentNode(item_tag, _inline_children(text, inline_parser)) for text in texts])
+
+def iter_html_nodes(source, inline_parser=text_to_textnodes):
+    #Yields one HTML node per block of a markdown document, streaming it line by line
+    for block_type, lines in iter_blocks(source):
+        yield block_to_html_node(block_type, lines, inline_parser)
+
+@instrument("blocks", count=lambda node: len(node.children))
+def markdown_to_html_node(markdown, inline_parser=text_to_textnodes):
+    #Converts a markdown document into a single div holding one node per block
+
+    if not isinstance(markdown, str):
+        raise ValueError("markdown must be a string")
+
+    children = list(iter_html_nodes(markdown, inline_parser))
+    if children == []:
+        children = [LeafNode(None, "")]
+    return ParentNode("div", children)
+
+def iter_markdown_html(source, inline_parser=text_to_textnodes):
+    #Yields the HTML of markdown_to_html_node(source) in pieces, building one block node at a time,
+    #so large documents can be written out without holding their whole node tree
+    yield "<div>"
+    for node in iter_html_nodes(source, inline_parser):
+        yield from node.iter_html()
+    yield "</div>"
@@ -0,0 +1,505 @@
+import hashlib
+import json
+import mmap
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from assets import asset_parser, asset_urls, copy_assets
+from blocks import iter_lines, iter_markdown_html, markdown_to_html_node
+from delimiter import text_to_textnodes
+from depgraph import BACKLINKS_SLOT, DependencyGraph, backlinks, backlinks_node, page_inputs, page_linkers
+from fileio import IOStage, IOStats, atomic_open, source_entry
+from linkcheck import LinkCollector
+from parsecache import ParseCache
+from rendercache import RenderCache
+from template import load_template
+import profiling
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 3
+
+# Sources at least this large are rendered from a memory map, one block at a time
+STREAM_THRESHOLD = 8 << 20
+# While streaming, mapped pages already parsed are released every this many bytes
+RELEASE_EVERY = 16 << 20
+# The most pages a pool worker renders per task
+BATCH_SIZE = 64
+
+# Outcome of build_site: output paths rendered, left unchanged and deleted, the IOStats of rendering
+# and the AssetResult of copying static files. update_pages also reports the pages it could not
+# render as (page, error message) pairs.
+BuildResult = namedtuple(
+    "BuildResult", ["rendered", "skipped", "removed", "io", "assets", "errors"], defaults=(None, None, None)
+)
+
+# Template, inline parse cache, block render cache, link collector, inline parser and I/O stage used
+# by the render tasks of the current process, set by _init_worker
+_template = None
+_parse_cache = None
+_render_cache = None
+_links = None
+_inline_parser = None
+_io = None
+
+def extract_title(markdown):
+    #Returns the text of the first "# " heading of a markdown document
+
+    for line in iter_lines(markdown):
+        if line.startswith("# "):
+            return line[2:].strip()
+    raise ValueError("markdown must have a level 1 heading")
+
+def page_output(relative):
+    #Maps a source path relative to the content directory to its output path, a/b.md to a/b.html
+    return os.path.splitext(relative)[0] + ".html"
+
+def output_path(source_path, content_dir, output_dir):
+    #Maps content_dir/a/b.md to output_dir/a/b.html
+    return os.path.join(output_dir, page_output(os.path.relpath(source_path, content_dir)))
+
+def find_pages(content_dir):
+    #Returns the path relative to content_dir of every markdown file under it, in a stable order
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        relative_root = os.path.relpath(root, content_dir)
+        for name in sorted(files):
+            if name.endswith(".md"):
+                pages.append(name if relative_root == "." else os.path.join(relative_root, name))
+    return pages
+
+def load_manifest(output_dir):
+    #Returns the manifest of the previous build, or an empty one if there is none usable
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "template": None, "pages": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "template": None, "pages": {}}
+    return manifest
+
+def save_manifest(output_dir, manifest):
+    #Writes the manifest next to the pages, replacing the old one atomically
+    with atomic_open(os.path.join(output_dir, MANIFEST_NAME)) as f:
+        f.write(json.dumps(manifest, separators=(",", ":")))
+
+def render_page(source_path, dest_path, template, inline_parser=text_to_textnodes, stream_threshold=STREAM_THRESHOLD,
+                extra=None):
+    #Converts one markdown file to HTML and streams it into the page template, returning the page title.
+    #extra holds values for template slots other than Title and Content.
+    #The "write" stage includes rendering, which happens as the page is written.
+    #Sources of stream_threshold bytes or more go through stream_page instead.
+
+    if stream_threshold is not None and os.path.getsize(source_path) >= max(stream_threshold, 1):
+        return stream_page(source_path, dest_path, template, inline_parser, extra)
+
+    with profiling.stage("read"):
+        with open(source_path, encoding="utf-8") as f:
+            markdown = f.read()
+
+    values = dict(extra or (), Title=extract_title(markdown), Content=markdown_to_html_node(markdown, inline_parser))
+
+    with profiling.stage("write"):
+        with atomic_open(dest_path) as f:
+            template.render_to(f, values)
+    return values["Title"]
+
+def mapped_title(mm):
+    #Returns the text of the first "# " line of a memory-mapped markdown document
+    if mm[:2] == b"# ":
+        start = 0
+    else:
+        start = mm.find(b"\n# ")
+        if start == -1:
+            raise ValueError("markdown must have a level 1 heading")
+        start += 1
+    end = mm.find(b"\n", start)
+    line = mm[start:end if end != -1 else len(mm)]
+    return line.decode("utf-8").rstrip("\r")[2:].strip()
+
+def mapped_lines(mm):
+    #Yields the decoded lines of a memory-mapped file, one at a time.
+    #Pages behind the read position are dropped from the mapping as it advances,
+    #so resident memory stays bounded however large the file is.
+
+    released = 0
+    for line in iter(mm.readline, b""):
+        yield line.decode("utf-8")
+        position = mm.tell()
+        if position - released >= RELEASE_EVERY and hasattr(mmap, "MADV_DONTNEED"):
+            end = position - position % mmap.PAGESIZE
+            mm.madvise(mmap.MADV_DONTNEED, released, end - released)
+            released = end
+
+def stream_page(source_path, dest_path, template, inline_parser=text_to_textnodes, extra=None):
+    #Renders a markdown file through a memory map, converting and writing one block at a time,
+    #and returns the page title.
+    #Neither the document, its node tree nor its HTML is ever held in memory as a whole;
+    #the output is identical to render_page's.
+
+    with open(source_path, "rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            raise ValueError("markdown must have a level 1 heading")
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            values = dict(
+                extra or (), Title=mapped_title(mm), Content=iter_markdown_html(mapped_lines(mm), inline_parser)
+            )
+
+            with profiling.stage("write"):
+                with atomic_open(dest_path) as f:
+                    template.render_to(f, values)
+    return values["Title"]
+
+def _init_worker(template, parse_cache_path, profiler=None, io_threads=0, urls=None):
+    global _template, _parse_cache, _render_cache, _links, _inline_parser, _io
+    _template = template
+    _parse_cache = ParseCache(path=parse_cache_path)
+    _render_cache = RenderCache()
+    # Links are recorded as written, before image URLs are rewritten to hashed asset names
+    _links = LinkCollector(_parse_cache.text_to_textnodes)
+    _inline_parser = asset_parser(_links, urls)
+    _io = IOStage(io_threads)
+    if profiler is not None:
+        profiling.enable(profiler)
+
+def _close_worker():
+    global _parse_cache, _render_cache, _links, _inline_parser, _io
+    try:
+        _io.close()
+    finally:
+        _io = None
+        _parse_cache.close()
+        _parse_cache = _render_cache = _links = _inline_parser = None
+        profiling.disable()
+
+def _render_batch(pages):
+    #Renders a batch of (source, dest, size, extra slot values) pages through the process's IOStage,
+    #which, given threads, prefetches sources and writes finished pages while the next one renders.
+    #Sources over STREAM_THRESHOLD are streamed instead, in this thread, and counted in the IOStats after.
+    #Returns [(links and images, title, measurements while profiling or None)] and the batch's IOStats.
+    #A page is only built as a whole string to hand it to I/O threads; without them it is rendered in
+    #chunks straight into its file.
+    #The "read" stage of a page is the time spent waiting on its source; the "write" stage includes rendering.
+
+    profiler = profiling.active()
+    reads = _io.read_all(source for source, _, size, _ in pages if size < STREAM_THRESHOLD)
+    results = []
+    for source, dest, size, extra in pages:
+        if profiler is not None:
+            profiler.start_page(source)
+        if size >= STREAM_THRESHOLD:
+            start = time.perf_counter()
+            title = stream_page(source, dest, _template, _inline_parser, extra)
+            _io.record_stream(size, os.path.getsize(dest), time.perf_counter() - start)
+        else:
+            with profiling.stage("read"):
+                markdown = next(reads).result()
+            title = extract_title(markdown)
+            content = _render_cache.iter_markdown_html(markdown, _inline_parser, _links)
+            values = dict(extra, Title=title, Content=content)
+            with profiling.stage("write"):
+                if _io.threads:
+                    _io.write(dest, _template.render(values))
+                else:
+                    _io.write_to(dest, lambda f: _template.render_to(f, values))
+        results.append((_links.pop(), title, profiler.pop_page() if profiler is not None else None))
+
+    # Pool workers are not shut down cleanly, so writes and new cache entries are completed per batch
+    _io.drain()
+    _parse_cache.flush()
+    stats, _io.stats = _io.stats, IOStats()
+    return results, stats
+
+def _render_pool(jobs, workers, initargs):
+    #Runs _render_batch over jobs, in the current process when workers is 1 or there is a single job.
+    #Returns the per-page results in order and the combined IOStats.
+
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker(*initargs)
+        try:
+            batches = [_render_batch(jobs)]
+        finally:
+            _close_worker()
+    else:
+        # Pages go to the pool in batches so each worker's I/O stage has several sources to prefetch
+        size = max(1, min(BATCH_SIZE, -(-len(jobs) // ((workers or os.cpu_count() or 1) * 4))))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            batches = list(pool.map(_render_batch, [jobs[i:i + size] for i in range(0, len(jobs), size)]))
+
+    results = []
+    io_stats = IOStats()
+    for batch, stats in batches:
+        results.extend(batch)
+        io_stats.merge(stats)
+    return results, io_stats
+
+def _render_affected(template, pages, old_pages, graph, changed, reasons, render):
+    #Renders the pages in reasons, then every other page whose backlinks turn out to have changed,
+    #updating their entries in pages (with links, title and the reason they were rendered) and graph.
+    #changed maps the inputs that changed to a description, reasons the pages to render to why.
+    #render(relatives, extras) renders pages given their extra slot values, returning (links, title) pairs,
+    #or None for a page that failed; render restores the entry of a failed page itself.
+    #Returns the pages rendered, in order.
+
+    linking = BACKLINKS_SLOT in template.slots
+    linkers = page_linkers(pages) if linking else {}
+
+    def render_round(relatives, reasons):
+        extras = [
+            {BACKLINKS_SLOT: backlinks_node(backlinks(pages, linkers.get(relative, ())))} if linking else {}
+            for relative in relatives
+        ]
+        done = []
+        for relative, result in zip(relatives, render(relatives, extras)):
+            if result is not None:
+                links, title = result
+                pages[relative] = dict(pages[relative], links=links, title=title, reason=reasons[relative])
+                done.append(relative)
+        return done
+
+    first = [relative for relative in pages if relative in reasons]
+    used = {relative: backlinks(pages, linkers.get(relative, ())) for relative in first} if linking else {}
+    first = render_round(first, reasons)
+    second = []
+
+    if linking:
+        # Links and titles of the pages just rendered are now known. Candidates for a second round are
+        # the pages using the title or links of a changed source, by the old graph or by the new links;
+        # of those, only pages whose backlinks really differ from what they were rendered with are redone.
+        candidates = graph.affected(changed)
+        linkers = page_linkers(pages)
+        for relative, sources in linkers.items():
+            for linker in sources:
+                if "source:" + linker in changed:
+                    candidates.setdefault(relative, changed["source:" + linker])
+        old_linkers = None
+        reasons = {}
+        for relative, reason in candidates.items():
+            if relative not in pages:
+                continue
+            if relative in used:
+                before = used[relative]
+            else:
+                if old_linkers is None:
+                    old_linkers = page_linkers(old_pages)
+                before = backlinks(old_pages, old_linkers.get(relative, ()))
+            if backlinks(pages, linkers.get(relative, ())) != before:
+                reasons[relative] = f"backlinks changed: {reason}" if relative not in used else pages[relative]["reason"]
+        second = render_round([relative for relative in pages if relative in reasons], reasons)
+
+    for relative in first + second:
+        graph.set(relative, page_inputs(relative, pages[relative], linkers.get(relative, ())))
+    return first + [relative for relative in second if relative not in first]
+
+def build_site(content_dir, output_dir, template_path, workers=None, force=False, parse_cache=None, profile=None,
+               io_threads=0, static_dir=None):
+    #Renders every markdown file under content_dir into output_dir.
+    #Only the pages affected by what changed since the last build are rendered: new pages, pages whose
+    #source changed or output is missing, and the pages using a changed input according to the
+    #dependency graph stored in the manifest (see depgraph); force=True renders everything.
+    #Each rendered page's manifest entry records why, the links and images it contains (for linkcheck)
+    #and its title.
+    #Pages are rendered across a process pool of workers processes (os.cpu_count() by default);
+    #workers=1 renders in the current process.
+    #Inline markdown is parsed through an in-memory ParseCache per process,
+    #backed by the sqlite file at parse_cache when given. Blocks repeated across pages are rendered
+    #once per process and reused through a RenderCache.
+    #Sources are read and pages written atomically through an IOStage per process; io_threads > 0
+    #gives each one that many threads to overlap disk waits with rendering, for slow storage.
+    #I/O throughput is returned as BuildResult.io.
+    #When profile is a profiling.Profiler, every stage of every page is measured into it.
+    #When static_dir is given its files (none if it does not exist) are mirrored into output_dir
+    #by assets.copy_assets, and images pointing at them are rewritten to their content-hashed names;
+    #without it the assets of the previous build are left in place.
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    template = load_template(template_path)
+    template_hash = hashlib.sha256(template.text.encode("utf-8")).hexdigest()
+
+    old_manifest = load_manifest(output_dir)
+    old_pages = old_manifest["pages"]
+    old_assets = old_manifest.get("assets", {})
+    asset_result = None
+    if static_dir is None:
+        assets = old_assets
+    else:
+        assets, asset_result = copy_assets(static_dir, output_dir, old_assets)
+
+    graph = DependencyGraph(old_manifest.get("graph"))
+    changed = {}
+    if force:
+        changed["template"] = "forced"
+    elif old_manifest["template"] != template_hash:
+        changed["template"] = "template changed"
+    urls = asset_urls(assets)
+    old_urls = asset_urls(old_assets)
+    for url in sorted(urls.keys() | old_urls.keys()):
+        if urls.get(url) != old_urls.get(url):
+            changed["asset:" + url] = f"asset {url} changed"
+
+    manifest = {"version": MANIFEST_VERSION, "template": template_hash, "pages": {}}
+    if assets:
+        manifest["assets"] = assets
+    pages = manifest["pages"]
+    dests = {}
+    reasons = {}
+    for relative in find_pages(content_dir):
+        source = os.path.join(content_dir, relative)
+        output = page_output(relative)
+        dests[relative] = dest = os.path.join(output_dir, output)
+        old_entry = old_pages.get(relative)
+        entry = source_entry(source, old_entry)
+        entry["output"] = output
+        if old_entry is None:
+            reasons[relative] = "new page"
+            changed["source:" + relative] = f"{relative} added"
+        else:
+            entry.update(links=old_entry["links"], title=old_entry["title"], reason=old_entry["reason"])
+            if old_entry["hash"] != entry["hash"]:
+                reasons[relative] = "source changed"
+                changed["source:" + relative] = f"{relative} changed"
+            elif old_entry["output"] != output or not os.path.exists(dest):
+                reasons[relative] = "output missing"
+        pages[relative] = entry
+
+    removed = []
+    for relative, old_entry in old_pages.items():
+        if relative not in pages:
+            dest = os.path.join(output_dir, old_entry["output"])
+            if os.path.exists(dest):
+                os.remove(dest)
+            removed.append(dest)
+            changed["source:" + relative] = f"{relative} removed"
+            graph.remove(relative)
+
+    for relative, reason in graph.affected({item: reason for item, reason in changed.items()
+                                            if not item.startswith("source:")}).items():
+        reasons.setdefault(relative, reason)
+
+    profiler = profiling.Profiler() if profile is not None and workers != 1 else profile
+    initargs = (template, parse_cache, profiler, io_threads, urls)
+    io_stats = IOStats()
+
+    def render(relatives, extras):
+        jobs = [
+            (os.path.join(content_dir, relative), dests[relative], pages[relative]["size"], extra)
+            for relative, extra in zip(relatives, extras)
+        ]
+        results, stats = _render_pool(jobs, workers, initargs)
+        io_stats.merge(stats)
+        for links, title, page in results:
+            if page is not None:
+                profile.add_page(*page)
+        return [(links, title) for links, title, _ in results]
+
+    rendered = _render_affected(template, pages, old_pages, graph, changed, reasons, render)
+    if profile is not None:
+        profile.io = io_stats
+
+    manifest["graph"] = graph.to_dict()
+    if manifest != old_manifest:
+        save_manifest(output_dir, manifest)
+
+    rendered_set = set(rendered)
+    return BuildResult(
+        [dests[relative] for relative in rendered],
+        [dest for relative, dest in dests.items() if relative not in rendered_set],
+        removed, io_stats, asset_result,
+    )
+
+def update_pages(content_dir, output_dir, template, manifest, relatives, inline_parser=text_to_textnodes, urls=None):
+    #Re-renders the given pages (paths relative to content_dir) and the pages they affect, in the
+    #current process, updating manifest in place. Pages whose source is gone are removed from the output.
+    #Used by watch mode, which already knows which files changed and keeps the manifest in memory.
+    #As in build_site, unchanged pages are skipped, the dependency graph is kept up to date
+    #and images are rewritten with urls, the site's asset_urls.
+    #A page that fails to render (no title, invalid UTF-8, unreadable) keeps its previous manifest entry
+    #and output, so the next build still sees it as changed; failures are returned in BuildResult.errors.
+
+    removed = []
+    pages = manifest["pages"]
+    old_pages = dict(pages)
+    graph = DependencyGraph(manifest.get("graph"))
+    changed = {}
+    reasons = {}
+
+    for relative in sorted(relatives):
+        source = os.path.join(content_dir, relative)
+        old_entry = pages.get(relative)
+
+        if not os.path.exists(source):
+            if old_entry:
+                dest = os.path.join(output_dir, old_entry["output"])
+                if os.path.exists(dest):
+                    os.remove(dest)
+                del pages[relative]
+                removed.append(dest)
+                changed["source:" + relative] = f"{relative} removed"
+                graph.remove(relative)
+            continue
+
+        output = page_output(relative)
+        entry = source_entry(source, old_entry)
+        entry["output"] = output
+        if old_entry is None:
+            reasons[relative] = "new page"
+            changed["source:" + relative] = f"{relative} added"
+        else:
+            entry.update(links=old_entry["links"], title=old_entry["title"], reason=old_entry["reason"])
+            if old_entry["hash"] != entry["hash"]:
+                reasons[relative] = "source changed"
+                changed["source:" + relative] = f"{relative} changed"
+            elif not os.path.exists(os.path.join(output_dir, output)):
+                reasons[relative] = "output missing"
+        pages[relative] = entry
+
+    collector = LinkCollector(inline_parser)
+    parser = asset_parser(collector, urls)
+
+    errors = []
+
+    def render(relatives, extras):
+        results = []
+        for relative, extra in zip(relatives, extras):
+            source = os.path.join(content_dir, relative)
+            dest = os.path.join(output_dir, pages[relative]["output"])
+            try:
+                title = render_page(source, dest, template, parser, extra=extra)
+            except (OSError, ValueError) as error:
+                collector.pop()
+                if relative in old_pages:
+                    pages[relative] = old_pages[relative]
+                else:
+                    del pages[relative]
+                errors.append((relative, str(error)))
+                results.append(None)
+                continue
+            results.append((collector.pop(), title))
+        return results
+
+    rendered = _render_affected(template, pages, old_pages, graph, changed, reasons, render)
+    manifest["graph"] = graph.to_dict()
+
+    attempted = set(rendered) | {relative for relative, _ in errors}
+    return BuildResult(
+        [os.path.join(output_dir, pages[relative]["output"]) for relative in rendered],
+        [os.path.join(output_dir, pages[relative]["output"]) for relative in sorted(relatives)
+         if relative in pages and relative not in attempted],
+        removed,
+        errors=errors,
+    )
+
+def why(manifest, page):
+    #Returns (reason, inputs): why page (relative to the content directory) was last rendered,
+    #and the inputs whose changes would render it again
+    entry = manifest["pages"].get(page)
+    if entry is None:
+        raise ValueError(f"{page} is not a page of this site")
+    return entry["reason"], DependencyGraph(manifest.get("graph")).dependencies(page)
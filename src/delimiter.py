@@ -1,12 +1,48 @@
+import re
+from bisect import bisect_left
 from enum import Enum
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import SpanTextNode, TextNode, TextType, text_node_to_html_node
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from extractlinks import *
-
-def split_nodes_delimiter(old_nodes, delimiter, text_type):
+from profiling import instrument
+
+# Openers the inline scanner stops at. "![" is listed before "[" so an image
+# always wins over the link it contains.
+_INLINE_OPENER = re.compile(r"!\[|\[|\*\*|_|`")
+_DELIMITER_TYPES = {"**": TextType.BOLD, "_": TextType.ITALIC, "`": TextType.CODE}
+# From an opener to the end of its line: over newline-joined strings, one match per string holding an opener
+_OPENER_LINE = re.compile("(?:" + _INLINE_OPENER.pattern + ").*")
+
+def _split_text_all_pairs(node, delimiter, text_type, new_nodes):
+    #Appends every delimited span of node to new_nodes in one pass over its text.
+    #The node itself is reused when it holds no complete pair.
+
+    text = node.text
+    size = len(delimiter)
+    pos = 0
+    start = text.find(delimiter)
+
+    while start != -1:
+        end = text.find(delimiter, start + size)
+        if end == -1:
+            break
+        if start > pos:
+            new_nodes.append(TextNode(text[pos:start], TextType.NORMAL))
+        if end > start + size:
+            new_nodes.append(TextNode(text[start + size:end], text_type))
+        pos = end + size
+        start = text.find(delimiter, pos)
+
+    if pos == 0:
+        new_nodes.append(node)
+    elif pos < len(text):
+        new_nodes.append(TextNode(text[pos:], TextType.NORMAL))
+
+def split_nodes_delimiter(old_nodes, delimiter, text_type, all_pairs=False):
     
     #Splits a list of nodes into two lists based on a delimiter.
     #The first list contains nodes before the delimiter, and the second list contains nodes after the delimiter.
+    #With all_pairs=True every pair in a node is split in the same pass instead of only the first one.
     
     if not isinstance(old_nodes, list):
         raise ValueError("old_nodes must be a list")
@@ -29,6 +65,10 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         if node.text == "":
             continue
         
+        if all_pairs and delimiter != "":
+            _split_text_all_pairs(node, delimiter, text_type, new_nodes)
+            continue
+
         text = node.text
 
         try:
@@ -52,102 +92,106 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
-def split_nodes_image(old_nodes):
-    #Splits a list of nodes into two lists based on image nodes.
-    #The first list contains nodes before the image, and the second list contains nodes after the image.
-    
-    if not isinstance(old_nodes, list):
-        raise ValueError("old_nodes must be a list")
-    
+def _split_nodes_pattern(old_nodes, pattern, kind):
+    #Splits normal nodes on every match of pattern using the match offsets,
+    #so each node's text is scanned exactly once.
+    #kind(match) gives the TextType of a match, whose text and url are the pattern's last two groups.
+
     new_nodes = []
 
     for node in old_nodes:
         if node.text_type != TextType.NORMAL:
             new_nodes.append(node)
             continue
-        
-        text = node.text
-        img = extract_markdown_images(text)
-        if len(img) == 0 and node.text != "":
-            new_nodes.append(node)
-            continue
-        while img:
-            alt_text = img[0][0]
-            link_text = img[0][1]
-        
-            sections = text.split(f"![{alt_text}]({link_text})", 1)
-
-            text_before = sections[0]
 
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown image format")
-
-            if text_before != "":
-                new_nodes.append(TextNode(text_before, TextType.NORMAL))
-            
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, link_text))
-            
-            if len(sections) > 1:
-                text = sections[1]
-                img = extract_markdown_images(text)
-            else:
-                text = ""
-                img = []
-        if text != "":
-            new_nodes.append(TextNode(text, TextType.NORMAL))
+        text = node.text
+        pos = 0
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.NORMAL))
+            new_nodes.append(TextNode(match.group(pattern.groups - 1), kind(match), match.group(pattern.groups)))
+            pos = match.end()
+
+        if pos == 0:
+            if text != "":
+                new_nodes.append(node)
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.NORMAL))
 
     return new_nodes
 
+def split_nodes_image(old_nodes):
+    #Splits normal nodes into text and image nodes.
+    #Every image in a node is emitted in order, with the text between them kept as normal nodes.
+    
+    if not isinstance(old_nodes, list):
+        raise ValueError("old_nodes must be a list")
 
+    return _split_nodes_pattern(old_nodes, IMAGE_RE, lambda match: TextType.IMAGE)
 
 def split_nodes_link(old_nodes):
-
-    #Splits a list of nodes into two lists based on link nodes.
-    #The first list contains nodes before the image, and the second list contains nodes after the link
+    #Splits normal nodes into text and link nodes.
+    #Every link in a node is emitted in order, with the text between them kept as normal nodes.
     
     if not isinstance(old_nodes, list):
         raise ValueError("old_nodes must be a list")
-    
-    new_nodes = []
 
-    for node in old_nodes:
-        if node.text_type != TextType.NORMAL:
-            new_nodes.append(node)
+    return _split_nodes_pattern(old_nodes, LINK_RE, lambda match: TextType.LINK)
+
+def _scan_inline(text, pos=0, endpos=None):
+    #Walks text[pos:endpos] once from left to right and yields (text_type, start, end, url) runs,
+    #with offsets into text. Nothing outside the bounds is read.
+    #Delimiters, images and links are matched where they open, so the leftmost construct wins.
+    #Unmatched openers stay part of the surrounding normal text.
+    length = len(text) if endpos is None else endpos
+    literal_start = pos
+
+    while pos < length:
+        opener = _INLINE_OPENER.search(text, pos, length)
+        if opener is None:
+            break
+        start = opener.start()
+        token = opener.group()
+        opener_end = start + len(token)
+
+        if token in _DELIMITER_TYPES:
+            close = text.find(token, opener_end, length)
+            if close == -1:
+                pos = opener_end
+                continue
+            if start > literal_start:
+                yield TextType.NORMAL, literal_start, start, None
+            if close > opener_end:
+                yield _DELIMITER_TYPES[token], opener_end, close, None
+            pos = literal_start = close + len(token)
             continue
-        
-        text = node.text
-        link = extract_markdown_links(text)
-        if len(link) == 0 and node.text != "":
-            new_nodes.append(node)
+
+        match = INLINE_RE.match(text, start, length)
+        if match is None:
+            pos = opener_end
             continue
-        while link:
-            alt_text = link[0][0]
-            link_text = link[0][1]
-        
-            sections = text.split(f"[{alt_text}]({link_text})", 1)
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown link format")
-
-            text_before = sections[0]
-
-            if text_before != "":
-                new_nodes.append(TextNode(text_before, TextType.NORMAL))
-            new_nodes.append(TextNode(alt_text, TextType.LINK, link_text))
-            
-            if len(sections) > 1:
-                text = sections[1]
-                link = extract_markdown_links(text)
-            else:
-                text = ""
-                link = []
-        if text != "":
-            new_nodes.append(TextNode(text, TextType.NORMAL))
+        if start > literal_start:
+            yield TextType.NORMAL, literal_start, start, None
+        yield inline_kind(match), match.start(2), match.end(2), match.group(3)
+        pos = literal_start = match.end()
+
+    if literal_start < length:
+        yield TextType.NORMAL, literal_start, length, None
 
-    return new_nodes
 
+def split_nodes_image_link(old_nodes):
+    #Splits normal nodes into text, image and link nodes.
+    #Images and links come from one scan of each node instead of one scan per kind.
+
+    if not isinstance(old_nodes, list):
+        raise ValueError("old_nodes must be a list")
+
+    return _split_nodes_pattern(old_nodes, INLINE_RE, inline_kind)
+
+@instrument("parse", count=len)
 def text_to_textnodes(text):
     #Converts a string to a list of TextNode objects.
-    #The function uses the split_nodes_delimiter, split_nodes_image, and split_nodes_link functions to split the text into nodes.
+    #The text is tokenized in a single left-to-right pass, bold, italic, code, images and links alike.
     
     if not isinstance(text, str):
         raise ValueError("text must be a string")
@@ -155,15 +199,50 @@ def text_to_textnodes(text):
     if text == "":
         return []
     
-    nodes = [TextNode(text, TextType.NORMAL)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    return nodes
-
-
+    return [
+        TextNode(text[start:end], text_type, url)
+        for text_type, start, end, url in _scan_inline(text)
+    ]
+
+@instrument("parse", count=len)
+def text_to_spannodes(text):
+    #Same as text_to_textnodes, but returns SpanTextNodes pointing into text instead of copies of its pieces.
     
-
-   
\ No newline at end of file
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+    
+    return [
+        SpanTextNode(text, start, end, text_type, url)
+        for text_type, start, end, url in _scan_inline(text)
+    ]
+
+@instrument("parse", count=lambda results: sum(map(len, results)))
+def text_to_textnodes_batch(texts):
+    #Converts a list of strings at once, returning [text_to_textnodes(text) for text in texts].
+    #The strings are joined into one buffer and a single regex pass finds where each line's first
+    #opener is. Strings without any opener become one normal node with no further regex call;
+    #the others are scanned in place within their own bounds, so nothing runs into the next string.
+
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        raise ValueError("texts must be a list of strings")
+
+    buffer = "\n".join(texts)
+    starts = list(map(re.Match.start, _OPENER_LINE.finditer(buffer)))
+
+    results = []
+    pos = 0
+    for text in texts:
+        end = pos + len(text)
+        if text == "":
+            results.append([])
+        else:
+            index = bisect_left(starts, pos)
+            if index == len(starts) or starts[index] >= end:
+                results.append([TextNode(text, TextType.NORMAL)])
+            else:
+                results.append([
+                    TextNode(buffer[start:stop], text_type, url)
+                    for text_type, start, stop, url in _scan_inline(buffer, pos, end)
+                ])
+        pos = end + 1
+    return results
@@ -0,0 +1,116 @@
+import os
+
+from htmlnode import LeafNode, ParentNode
+from linkcheck import is_external, link_target
+from textnode import TextType
+
+# Template slot listing the pages that link to the page being rendered
+BACKLINKS_SLOT = "Backlinks"
+
+class DependencyGraph():
+    #Records the inputs each page was last rendered from and, reversed, the pages using each input,
+    #so a set of changed inputs maps to the pages to render again. Inputs are strings:
+    #  "template"       the page template
+    #  "source:<page>"  the page's own markdown
+    #  "asset:<url>"    a site file shown as an image, by its URL as written
+    #  "title:<page>"   the title of a page shown in this page's backlinks
+    #  "links:<page>"   the links of a page, which decide whose backlinks it appears in
+    #A page's "title:" and "links:" come from its source, so a changed source also reaches
+    #the pages using them.
+
+    def __init__(self, edges=None):
+        # Sorted input lists by page, as stored in the manifest; the reverse index is built on first use
+        self.edges = dict(edges or {})
+        self._users = None
+
+    @property
+    def users(self):
+        #{input: set of pages using it}
+        if self._users is None:
+            self._users = {}
+            for page, inputs in self.edges.items():
+                for item in inputs:
+                    self._users.setdefault(item, set()).add(page)
+        return self._users
+
+    def set(self, page, inputs):
+        #Replaces the inputs of page
+        self.remove(page)
+        self.edges[page] = sorted(set(inputs))
+        for item in self.edges[page]:
+            self.users.setdefault(item, set()).add(page)
+
+    def remove(self, page):
+        users = self.users
+        for item in self.edges.pop(page, ()):
+            pages = users[item]
+            pages.discard(page)
+            if not pages:
+                del users[item]
+
+    def dependencies(self, page):
+        return list(self.edges.get(page, ()))
+
+    def affected(self, changed):
+        #Returns {page: reason} for every page using an input in changed, a {input: reason} dict,
+        #directly or through the title and links of a page whose source changed.
+        #The first reason found for a page is kept.
+
+        if not changed:
+            return {}
+        changed = dict(changed)
+        for item, reason in list(changed.items()):
+            if item.startswith("source:"):
+                page = item[len("source:"):]
+                changed.setdefault("title:" + page, reason)
+                changed.setdefault("links:" + page, reason)
+
+        affected = {}
+        for item, reason in changed.items():
+            for page in self.users.get(item, ()):
+                affected.setdefault(page, reason)
+        return affected
+
+    def to_dict(self):
+        return dict(self.edges)
+
+def page_linkers(pages):
+    #Returns {page: [pages linking to it, in order]} from manifest page entries.
+    #Links are resolved like linkcheck does; a page linking to itself is not counted.
+
+    outputs = {entry["output"].replace(os.sep, "/"): page for page, entry in pages.items()}
+    linkers = {}
+    for page, entry in sorted(pages.items()):
+        targets = set()
+        for kind, url, _ in entry.get("links", ()):
+            if kind != TextType.LINK.value or is_external(url):
+                continue
+            target = link_target(entry["output"], url)
+            if target is None:
+                continue
+            linked = outputs.get(target) or outputs.get(target + ".html") or outputs.get(target + "/index.html")
+            if linked is not None and linked != page and linked not in targets:
+                targets.add(linked)
+                linkers.setdefault(linked, []).append(page)
+    return linkers
+
+def backlinks(pages, linkers):
+    #Returns [(title, url)] of the pages in linkers, for the Backlinks slot
+    return [(pages[page].get("title"), "/" + pages[page]["output"].replace(os.sep, "/")) for page in linkers]
+
+def backlinks_node(items):
+    #Renders backlinks as a list of links, or nothing when there are none
+    if not items:
+        return ""
+    return ParentNode("ul", [ParentNode("li", [LeafNode("a", title, {"href": url})]) for title, url in items])
+
+def page_inputs(page, entry, linkers=()):
+    #Returns the inputs of the page with manifest entry, given the pages linking to it
+    inputs = {"template", "source:" + page}
+    for kind, url, _ in entry.get("links", ()):
+        if kind == TextType.IMAGE.value and not is_external(url):
+            inputs.add("asset:" + url)
+    for linker in linkers:
+        inputs.add("title:" + linker)
+        inputs.add("links:" + linker)
+    return inputs
@@ -1,14 +1,44 @@
 import re
+from collections import namedtuple
+
+from textnode import TextType
+
+# Alt/anchor text may hold one level of nested brackets, urls may hold escaped parentheses
+_TEXT = r"\[((?:[^\[\]]|\[[^\[\]]*\])*)\]"
+_URL = r"\(((?:\\[\(\)]|[^\(\)])*)\)"
+
+# Compiled once at import; the link pattern skips the "[...](...)" part of an image
+IMAGE_RE = re.compile(r"!" + _TEXT + _URL)
+LINK_RE = re.compile(r"(?<!!)" + _TEXT + _URL)
+INLINE_RE = re.compile(r"(!?)" + _TEXT + _URL)
+
+# One image or link found by extract_markdown_inline
+InlineMatch = namedtuple("InlineMatch", ["kind", "start", "end", "text", "url"])
 
 def extract_markdown_images(text):
 
     if not isinstance(text, str):
         raise ValueError("text must be a string")
     
-    return re.findall(r"!\[((?:[^\[\]]|\[[^\[\]]*\])*)\]\(((?:\\[\(\)]|[^\(\)])*)\)", text)
+    return IMAGE_RE.findall(text)
 
 def extract_markdown_links(text):
     
     if not isinstance(text, str):
         raise ValueError("text must be a string")
-    return re.findall(r"\[((?:[^\[\]]|\[[^\[\]]*\])*)\]\(((?:\\[\(\)]|[^\(\)])*)\)", text) 
+    return LINK_RE.findall(text)
+
+def inline_kind(match):
+    #Returns the TextType of an INLINE_RE match, IMAGE or LINK
+    return TextType.IMAGE if match.group(1) else TextType.LINK
+
+def inline_match(match):
+    #Converts an INLINE_RE match into an InlineMatch
+    return InlineMatch(inline_kind(match), match.start(), match.end(), match.group(2), match.group(3))
+
+def extract_markdown_inline(text):
+    #Returns every image and link in the text from a single scan, in document order
+
+    if not isinstance(text, str):
+        raise ValueError("text must be a string")
+    return [inline_match(match) for match in INLINE_RE.finditer(text)]
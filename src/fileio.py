@@ -0,0 +1,193 @@
+import hashlib
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+def file_hash(path):
+    #Returns the sha256 hex digest of a file's bytes
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_entry(source_path, old_entry):
+    #Returns the manifest entry for a source.
+    #The file is only re-hashed when its size or mtime differ from the previous build.
+    stat = os.stat(source_path)
+    if old_entry and old_entry["mtime_ns"] == stat.st_mtime_ns and old_entry["size"] == stat.st_size:
+        digest = old_entry["hash"]
+    else:
+        digest = file_hash(source_path)
+    return {"hash": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+@contextmanager
+def atomic_open(path, mode="w"):
+    #Opens a temporary file next to path and renames it over path once the block completes,
+    #so a file is never seen half written. On error the temporary file is removed.
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def atomic_write(path, data):
+    #Writes a string or bytes to path with atomic_open, returning the number of bytes written
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with atomic_open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+class IOStats():
+    #Files, bytes and time spent in the I/O threads, kept apart from parse and render time.
+    #Seconds are summed over threads, so they can exceed the wall time of a build.
+
+    def __init__(self):
+        self.files_read = 0
+        self.bytes_read = 0
+        self.read_seconds = 0.0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.write_seconds = 0.0
+
+    def merge(self, other):
+        #Adds the counts of another IOStats, e.g. one sent back by a pool worker
+        for name, value in vars(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        def throughput(files, size, seconds):
+            rate = size / seconds / (1 << 20) if seconds else 0.0
+            return f"{files} files, {size / (1 << 20):.1f} MB in {seconds:.2f}s ({rate:.1f} MB/s)"
+        return (
+            f"read {throughput(self.files_read, self.bytes_read, self.read_seconds)}; "
+            f"wrote {throughput(self.files_written, self.bytes_written, self.write_seconds)}"
+        )
+
+class IOStage():
+    #Reads sources and writes pages on a bounded pool of threads so disk waits overlap rendering.
+    #Up to limit reads are prefetched ahead of the consumer and up to limit writes are queued
+    #before write() blocks, which bounds the memory held by pages in flight.
+    #With threads=0 every operation runs in the calling thread when it is issued. That is the faster
+    #choice when files sit in the page cache: each syscall of an I/O thread has to win the GIL back
+    #from the rendering thread, which costs up to sys.getswitchinterval() per call.
+
+    def __init__(self, threads=4, limit=64):
+        if not isinstance(threads, int) or threads < 0:
+            raise ValueError("threads must be a non-negative integer")
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit must be a positive integer")
+        self.threads = threads
+        self.limit = limit
+        self.stats = IOStats()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="io") if threads else None
+        self._writes = deque()
+
+    def _submit(self, func, *args):
+        #Runs func on the pool, or right away without one, returning a Future either way
+        if self._pool is not None:
+            return self._pool.submit(func, *args)
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+    def _read(self, path):
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as f:
+            size = os.fstat(f.fileno()).st_size
+            text = f.read()
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.stats.files_read += 1
+            self.stats.bytes_read += size
+            self.stats.read_seconds += seconds
+        return text
+
+    def _write(self, path, data):
+        start = time.perf_counter()
+        size = atomic_write(path, data)
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.stats.files_written += 1
+            self.stats.bytes_written += size
+            self.stats.write_seconds += seconds
+        return path
+
+    def record_stream(self, bytes_read, bytes_written, seconds):
+        #Counts a page streamed in the calling thread rather than through the I/O threads.
+        #Its reads, rendering and writes are interleaved, so all of seconds is counted as writing.
+        with self._lock:
+            self.stats.files_read += 1
+            self.stats.bytes_read += bytes_read
+            self.stats.files_written += 1
+            self.stats.bytes_written += bytes_written
+            self.stats.write_seconds += seconds
+
+    def read_all(self, paths):
+        #Yields a future of the text of each file, in order, with reads running ahead of the caller
+        paths = iter(paths)
+        pending = deque(self._submit(self._read, path) for path in itertools.islice(paths, self.limit))
+        while pending:
+            future = pending.popleft()
+            for path in itertools.islice(paths, 1):
+                pending.append(self._submit(self._read, path))
+            yield future
+
+    def write(self, path, data):
+        #Queues an atomic write of data to path, waiting for older writes while limit are pending
+        while len(self._writes) >= self.limit:
+            self._writes.popleft().result()
+        self._writes.append(self._submit(self._write, path, data))
+
+    def write_to(self, path, render):
+        #Atomically writes to path whatever render(f) writes into the open file f, in the calling thread.
+        #Lets a stage without threads stream a page into its file instead of building it as a string;
+        #rendering is then part of the write time counted.
+        start = time.perf_counter()
+        with atomic_open(path) as f:
+            render(f)
+        size = os.path.getsize(path)
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.stats.files_written += 1
+            self.stats.bytes_written += size
+            self.stats.write_seconds += seconds
+        return path
+
+    def drain(self):
+        #Waits for every queued write, raising the first error
+        while self._writes:
+            self._writes.popleft().result()
+
+    def close(self):
+        try:
+            self.drain()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
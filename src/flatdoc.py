@@ -0,0 +1,359 @@
+from array import array
+
+from textnode import TextNode, TextType, text_node_to_html_node
+from htmlnode import LeafNode, ParentNode, _render_props, props_items
+from delimiter import _scan_inline
+from blocks import BlockType, _code_text, block_inline_texts, iter_blocks
+from profiling import instrument
+
+# Node kinds: an element with children (ParentNode), a leaf with its own tag and props (LeafNode),
+# and after those one code per TextType, in declaration order
+ELEMENT = 0
+LEAF = 1
+_TEXT_CODES = {text_type: code for code, text_type in enumerate(TextType, 2)}
+_TEXT_TYPES = [None, None] + list(TextType)
+
+# Tags of the text kinds, None for normal text; links and images are rendered apart
+_TEXT_TAGS = [None, None, None, "b", "i", "code", "a", "img"]
+
+# Index stored where a node has no tag, url, props, parent, child or sibling
+NONE = -1
+
+class FlatDocument():
+    #An HTML document held in parallel arrays instead of node objects, one slot per node:
+    #  kind          ELEMENT, LEAF or the code of a TextType
+    #  tag           index into tags, for elements and leaves
+    #  start, end    span of the node's text in source
+    #  url           index into urls, for links and images
+    #  props         index into props_table, the interned props_items of elements and leaves
+    #  parent, first_child, next_sibling   the tree, as node indices
+    #Nodes are stored in document order, and nodes without a parent are the top-level nodes.
+    #Tags, urls and props are interned, so a URL used a thousand times is stored once.
+    #Built with open_element/add_text/add_leaf/close_element, or with the from_* constructors.
+
+    def __init__(self):
+        self.kind = array("b")
+        self.tag = array("i")
+        self.start = array("q")
+        self.end = array("q")
+        self.url = array("i")
+        self.props = array("i")
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.tags = []
+        self.urls = []
+        self.props_table = []
+        self._interned = ({}, {}, {})
+        self._source = ""
+        self._pieces = []
+        self._size = 0
+        # [node, last child] of each element still open, then of the top level
+        self._open = [[NONE, NONE]]
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def source(self):
+        #The text every node's span points into
+        if self._pieces:
+            self._source = "".join([self._source] + self._pieces)
+            self._pieces = []
+        return self._source
+
+    def _intern(self, table, index, value):
+        if value is None:
+            return NONE
+        found = index.get(value)
+        if found is None:
+            found = index[value] = len(table)
+            table.append(value)
+        return found
+
+    def _text(self, text):
+        #Appends text to the source, returning its span
+        start = self._size
+        if text:
+            self._pieces.append(text)
+            self._size += len(text)
+        return start, self._size
+
+    def _append(self, kind, tag, start, end, url, props):
+        node = len(self.kind)
+        opened = self._open[-1]
+        parent, last = opened
+        if last != NONE:
+            self.next_sibling[last] = node
+        elif parent != NONE:
+            self.first_child[parent] = node
+        opened[1] = node
+
+        self.kind.append(kind)
+        self.tag.append(self._intern(self.tags, self._interned[0], tag))
+        self.start.append(start)
+        self.end.append(end)
+        self.url.append(self._intern(self.urls, self._interned[1], url))
+        self.props.append(self._intern(self.props_table, self._interned[2], props_items(props)))
+        self.parent.append(parent)
+        self.first_child.append(NONE)
+        self.next_sibling.append(NONE)
+        return node
+
+    def open_element(self, tag, props=None):
+        #Adds an element; the nodes added until close_element become its children
+        if tag is None or tag == "":
+            raise ValueError("ParentNode must have a tag")
+        node = self._append(ELEMENT, tag, self._size, self._size, None, props)
+        self._open.append([node, NONE])
+        return node
+
+    def close_element(self):
+        if len(self._open) == 1:
+            raise ValueError("no element is open")
+        node = self._open.pop()[0]
+        if self.first_child[node] == NONE:
+            raise ValueError("ParentNode must have children")
+        return node
+
+    def add_text(self, text, text_type, url=None):
+        #Adds the TextNode(text, text_type, url)
+        if not isinstance(text_type, TextType):
+            raise ValueError("Invalid text type")
+        start, end = self._text(text)
+        return self._append(_TEXT_CODES[text_type], None, start, end, url, None)
+
+    def add_leaf(self, tag, value, props=None):
+        #Adds the LeafNode(tag, value, props)
+        if value is None:
+            raise ValueError("LeafNode must have a value")
+        start, end = self._text(value)
+        return self._append(LEAF, tag, start, end, None, props)
+
+    def add_textnodes(self, nodes):
+        for node in nodes:
+            self.add_text(node.text, node.text_type, node.url)
+
+    def _add_inline(self, text, inline_parser):
+        #Adds the inline children of text, as _inline_children in blocks does
+        if inline_parser is not None:
+            nodes = inline_parser(text)
+            if nodes == []:
+                self.add_text("", TextType.NORMAL)
+            self.add_textnodes(nodes)
+            return
+
+        # The spans found by the scanner are offsets into text, which is appended to the source whole.
+        # This is _append unrolled for text nodes sharing one parent, the hot loop of from_markdown.
+        base, _ = self._text(text)
+        urls, interned = self.urls, self._interned[1]
+        kinds, starts, ends, node_urls = [], [], [], []
+        for text_type, start, end, url in _scan_inline(text):
+            kinds.append(_TEXT_CODES[text_type])
+            starts.append(base + start)
+            ends.append(base + end)
+            if url is None:
+                node_urls.append(NONE)
+            else:
+                found = interned.get(url)
+                if found is None:
+                    found = interned[url] = len(urls)
+                    urls.append(url)
+                node_urls.append(found)
+
+        count = len(kinds)
+        if count == 0:
+            self.add_text("", TextType.NORMAL)
+            return
+        opened = self._open[-1]
+        parent, last = opened
+        node = len(self.kind)
+        if last != NONE:
+            self.next_sibling[last] = node
+        elif parent != NONE:
+            self.first_child[parent] = node
+        self.kind.extend(kinds)
+        self.start.extend(starts)
+        self.end.extend(ends)
+        self.url.extend(node_urls)
+        self.tag.extend(array("i", [NONE]) * count)
+        self.props.extend(array("i", [NONE]) * count)
+        self.parent.extend(array("i", [parent]) * count)
+        self.first_child.extend(array("i", [NONE]) * count)
+        self.next_sibling.extend(array("i", range(node + 1, node + count)))
+        self.next_sibling.append(NONE)
+        opened[1] = node + count - 1
+
+    def roots(self):
+        #Yields the top-level nodes
+        node = 0 if len(self.kind) else NONE
+        while node != NONE:
+            yield node
+            node = self.next_sibling[node]
+
+    def children(self, node):
+        child = self.first_child[node]
+        while child != NONE:
+            yield child
+            child = self.next_sibling[child]
+
+    def text(self, node):
+        return self.source[self.start[node]:self.end[node]]
+
+    def _leaf_html(self, node, source):
+        kind = self.kind[node]
+        value = source[self.start[node]:self.end[node]]
+        if kind == LEAF:
+            tag = self.tag[node]
+            if tag == NONE:
+                return value
+            tag = self.tags[tag]
+            props = self.props[node]
+            props = "" if props == NONE else _render_props(self.props_table[props])
+            return f"<{tag}{props}>{value}</{tag}>"
+        if kind == _TEXT_CODES[TextType.NORMAL]:
+            return value
+        if kind == _TEXT_CODES[TextType.LINK]:
+            return f"<a{_render_props((('href', str(self._url(node))),))}>{value}</a>"
+        if kind == _TEXT_CODES[TextType.IMAGE]:
+            return f"<img{_render_props((('src', str(self._url(node))), ('alt', value)))}></img>"
+        tag = _TEXT_TAGS[kind]
+        return f"<{tag}>{value}</{tag}>"
+
+    def _url(self, node):
+        url = self.url[node]
+        return None if url == NONE else self.urls[url]
+
+    def _open_tag(self, node):
+        props = self.props[node]
+        props = "" if props == NONE else _render_props(self.props_table[props])
+        return f"<{self.tags[self.tag[node]]}{props}>"
+
+    def iter_html(self, node=None):
+        #Yields the HTML of node, or of every top-level node, in pieces.
+        #The tree is walked through the child and sibling arrays, climbing back up through parent,
+        #so no stack is kept and no node objects are created.
+        if node is None:
+            for root in self.roots():
+                yield from self.iter_html(root)
+            return
+
+        if len(self._open) > 1:
+            raise ValueError("elements are still open")
+        source = self.source
+        kind, first_child, next_sibling, parent = self.kind, self.first_child, self.next_sibling, self.parent
+        root = node
+        while True:
+            if kind[node] == ELEMENT:
+                yield self._open_tag(node)
+                node = first_child[node]
+                continue
+            yield self._leaf_html(node, source)
+            while node != root and next_sibling[node] == NONE:
+                node = parent[node]
+                yield f"</{self.tags[self.tag[node]]}>"
+            if node == root:
+                return
+            node = next_sibling[node]
+
+    @instrument("render")
+    def to_html(self, node=None):
+        return "".join(self.iter_html(node))
+
+    def write_html(self, fp, node=None):
+        for chunk in self.iter_html(node):
+            fp.write(chunk)
+
+    def _to_object(self, node):
+        kind = self.kind[node]
+        props = self.props[node]
+        props = None if props == NONE else dict(self.props_table[props])
+        if kind == ELEMENT:
+            return ParentNode(self.tags[self.tag[node]], [], props)
+        if kind == LEAF:
+            tag = self.tag[node]
+            return LeafNode(None if tag == NONE else self.tags[tag], self.text(node), props)
+        return text_node_to_html_node(self.to_textnode(node))
+
+    def to_textnode(self, node):
+        text_type = _TEXT_TYPES[self.kind[node]]
+        if text_type is None:
+            raise ValueError("node is not a text node")
+        return TextNode(self.text(node), text_type, self._url(node))
+
+    def to_textnodes(self, node=None):
+        #Returns the TextNodes of the children of node, or of the top-level nodes
+        nodes = self.roots() if node is None else self.children(node)
+        return [self.to_textnode(child) for child in nodes]
+
+    def to_html_node(self, node=0):
+        #Returns node as the equivalent HTMLNode tree: elements become ParentNodes, leaves LeafNodes
+        #and text nodes what text_node_to_html_node gives for them
+        if not 0 <= node < len(self.kind):
+            raise ValueError("node out of range")
+        result = self._to_object(node)
+        stack = [(node, result)]
+        while stack:
+            parent, html_node = stack.pop()
+            for child in self.children(parent):
+                converted = self._to_object(child)
+                html_node.children.append(converted)
+                if self.kind[child] == ELEMENT:
+                    stack.append((child, converted))
+        return result
+
+    @classmethod
+    def from_textnodes(cls, nodes):
+        #Returns a document whose top-level nodes are the TextNodes in nodes
+        document = cls()
+        document.add_textnodes(nodes)
+        return document
+
+    @classmethod
+    def from_html_node(cls, html_node):
+        #Returns a document holding a copy of an HTMLNode tree. The leaves are stored as they
+        #are, a LeafNode("b", "x") stays a leaf and is not turned back into a bold text node.
+        document = cls()
+        stack = [iter([html_node])]
+        while stack:
+            for node in stack[-1]:
+                if isinstance(node, ParentNode):
+                    if node.children is None or len(node.children) == 0:
+                        raise ValueError("ParentNode must have children")
+                    document.open_element(node.tag, node.props)
+                    stack.append(iter(node.children))
+                    break
+                document.add_leaf(node.tag, node.value, node.props)
+            else:
+                stack.pop()
+                if stack:
+                    document.close_element()
+        return document
+
+    @classmethod
+    @instrument("blocks")
+    def from_markdown(cls, source, inline_parser=None):
+        #Builds the document of markdown_to_html_node(source) without creating any node objects.
+        #Inline markdown is scanned straight into the arrays; an inline_parser (e.g. a ParseCache's)
+        #is used instead when given, its TextNodes copied in and dropped.
+        document = cls()
+        document.open_element("div")
+        for block_type, lines in iter_blocks(source):
+            if block_type is BlockType.CODE:
+                document.open_element("pre")
+                document.add_text(_code_text(lines), TextType.CODE)
+                document.close_element()
+                continue
+            tag, item_tag, texts = block_inline_texts(block_type, lines)
+            document.open_element(tag)
+            for text in texts:
+                if item_tag is not None:
+                    document.open_element(item_tag)
+                document._add_inline(text, inline_parser)
+                if item_tag is not None:
+                    document.close_element()
+            document.close_element()
+        if document.first_child[0] == NONE:
+            document.add_text("", TextType.NORMAL)
+        document.close_element()
+        return document
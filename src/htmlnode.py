@@ -1,22 +1,64 @@
+import html
+from functools import lru_cache
+
+from profiling import instrument
+
+
+def props_items(props):
+    # Returns props as the (name, value) strings they render to, or None when there are none.
+    # Props are cached and compared in this form: 1 and True are equal values but render differently,
+    # so keys built from the values themselves would mix them up.
+    return tuple((str(name), str(value)) for name, value in props.items()) if props else None
+
+
+@lru_cache(maxsize=4096)
+def _render_props(items):
+    # Renders (name, value) pairs, as given by props_items, as escaped attributes.
+    # Keyed by the pairs themselves, so identical props across nodes render once
+    # and changing a node's props simply misses the cache.
+    return "".join(f' {name}="{html.escape(value, quote=True)}"' for name, value in items)
+
 
 class HTMLNode():
+    # Slots instead of a per-instance __dict__, a site build holds millions of nodes
+    __slots__ = ("tag", "value", "children", "props", "_props_key", "_props_html")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
+        # Copy of the props last rendered by props_to_html and the result
+        self._props_key = None
+        self._props_html = ""
     
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
+
+    def iter_html(self):
+        # Yields the rendered HTML in chunks, nodes without children render in one chunk
+        yield self.to_html()
+
+    @instrument("render")
+    def write_html(self, fp):
+        # Writes the rendered HTML to a file-like object as it is produced
+        for chunk in self.iter_html():
+            fp.write(chunk)
     
     def props_to_html(self):
         if self.props is None:
             return ""
         if self.props == {}:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
+        if self.props == self._props_key:
+            return self._props_html
+        props_html = _render_props(props_items(self.props))
+        # Only string values are kept to compare against, see props_items
+        if all(type(value) is str for value in self.props.values()):
+            self._props_key = dict(self.props)
+        else:
+            self._props_key = None
+        self._props_html = props_html
         return props_html
     
 
@@ -24,6 +66,8 @@ class HTMLNode():
         return f"HTMLNODE({self.tag}, {self.value}, {self.children}, {self.props})"
     
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
     
@@ -37,16 +81,80 @@ class LeafNode(HTMLNode):
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
     
+class SpanLeafNode(LeafNode):
+    # A LeafNode whose value is the span source[start:end] of a larger string.
+    # The value is sliced out only while rendering, the node never holds its own copy.
+    __slots__ = ("start", "end")
+
+    # The source is kept in the slot HTMLNode stores value in, so a span adds only its two offsets
+    source = HTMLNode.value
+
+    def __init__(self, tag, source, start, end, props=None):
+        super().__init__(tag, source, props)
+        self.start = start
+        self.end = end
+
+    @property
+    def value(self):
+        if self.source is None:
+            return None
+        return self.source[self.start:self.end]
+
+    @value.setter
+    def value(self, value):
+        self.source = value
+        self.start = 0
+        self.end = 0 if value is None else len(value)
+
+    def iter_html(self):
+        # The tags and the span as separate chunks, so the value is never formatted into a new string.
+        # ParentNode.iter_html takes these chunks too, so spans inside a tree are written the same way.
+        if self.source is None:
+            raise ValueError("LeafNode must have a value")
+        if self.tag is None:
+            yield self.source[self.start:self.end]
+            return
+        yield f"<{self.tag}{self.props_to_html()}>"
+        yield self.source[self.start:self.end]
+        yield f"</{self.tag}>"
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
+    @instrument("render")
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # Walks the tree with an explicit stack instead of recursing,
+        # so nesting depth is not limited by the interpreter's recursion limit
+        self._check()
+        yield f"<{self.tag}{self.props_to_html()}>"
+        stack = [(self.tag, iter(self.children))]
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    child._check()
+                    yield f"<{child.tag}{child.props_to_html()}>"
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                if isinstance(child, SpanLeafNode):
+                    yield from child.iter_html()
+                    continue
+                yield child.to_html()
+            else:
+                stack.pop()
+                yield f"</{tag}>"
+
+    def _check(self):
         if self.tag is None or self.tag == "":
              raise ValueError("ParentNode must have a tag")
         if self.children is None or len(self.children) == 0:
             raise ValueError("ParentNode must have children")
-        return f"<{self.tag}{self.props_to_html()}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
     
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
@@ -0,0 +1,87 @@
+import os
+import posixpath
+from collections import namedtuple
+from urllib.parse import unquote, urlsplit
+
+from textnode import TextType
+
+# Outcome of check_links: broken internal references as (page, url, anchor text) tuples,
+# external URLs mapped to the pages using them, and the number of references checked
+LinkReport = namedtuple("LinkReport", ["broken", "external", "checked"])
+
+class LinkCollector():
+    #Wraps an inline parser, recording [text type, url, anchor text] for each link and image
+    #it returns, so the link index is built from the parse the page needs anyway.
+    #pop() hands over what was recorded since the last call, i.e. one page's references.
+
+    def __init__(self, inline_parser):
+        self.inline_parser = inline_parser
+        self.links = []
+
+    def __call__(self, text):
+        nodes = self.inline_parser(text)
+        for node in nodes:
+            if node.text_type is TextType.LINK or node.text_type is TextType.IMAGE:
+                self.links.append([node.text_type.value, node.url, node.text])
+        return nodes
+
+    def pop(self):
+        links, self.links = self.links, []
+        return links
+
+def is_external(url):
+    #Returns whether url points off the site, e.g. https://..., mailto:... or //host/...
+    parts = urlsplit(url)
+    return bool(parts.scheme or parts.netloc)
+
+def link_target(page_output, url):
+    #Returns the output path, relative to the output directory and "/"-separated, that a
+    #site-internal url used on the page rendered to page_output refers to.
+    #Fragment-only links refer to the page itself. Returns None for paths leaving the site.
+
+    path = unquote(urlsplit(url).path)
+    page = page_output.replace(os.sep, "/")
+    if path == "":
+        return page
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page), path)
+    target = posixpath.normpath(path.lstrip("/"))
+    if target == ".." or target.startswith("../"):
+        return None
+    if path.endswith("/") or target == ".":
+        return "index.html" if target == "." else target + "/index.html"
+    return target
+
+def output_files(output_dir):
+    #Returns the set of "/"-separated paths of every file under output_dir, relative to it
+    files = set()
+    for root, dirs, names in os.walk(output_dir):
+        relative_root = os.path.relpath(root, output_dir).replace(os.sep, "/")
+        prefix = "" if relative_root == "." else relative_root + "/"
+        files.update(prefix + name for name in names)
+    return files
+
+def check_links(manifest, output_dir):
+    #Checks every link and image recorded in the manifest's pages against the files in output_dir.
+    #Internal references are resolved with link_target and must name an existing file, or a
+    #directory holding index.html; a missing extension also accepts the ".html" page.
+    #External URLs are collected, not fetched.
+
+    files = output_files(output_dir)
+    broken = []
+    external = {}
+    checked = 0
+
+    for page, entry in sorted(manifest["pages"].items()):
+        for _, url, text in entry.get("links", ()):
+            checked += 1
+            if is_external(url):
+                external.setdefault(url, []).append(page)
+                continue
+            target = link_target(entry["output"], url)
+            if target is None or not (
+                target in files or target + "/index.html" in files or target + ".html" in files
+            ):
+                broken.append((page, url, text))
+
+    return LinkReport(broken, external, checked)
@@ -1,9 +1,92 @@
-from textnode import TextNode, TextType
+import argparse
+import sys
+import time
 
+from build import build_site, load_manifest, why
+from linkcheck import check_links
+from profiling import Profiler
+from serve import serve
 
-def main():
-    # Create an instance of TextNode
-    node = TextNode("Hello, World!", TextType.NORMAL, "link.com")  
-    print(node)
 
-main()
\ No newline at end of file
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Static site generator")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="render a content directory to HTML")
+    serve_command = commands.add_parser("serve", help="build, then serve the output directory over HTTP")
+    why_command = commands.add_parser("why", help="show why a page was last rendered and what it depends on")
+    why_command.add_argument("page", help="markdown source, relative to the content directory")
+    why_command.add_argument("--output", default="public", help="built output directory")
+    for command in (build, serve_command):
+        command.add_argument("--content", default="content", help="directory of markdown sources")
+        command.add_argument("--output", default="public", help="directory to write HTML into")
+        command.add_argument("--template", default="template.html", help="page template")
+        command.add_argument("--static", default="static", help="directory of static files copied to the output")
+        command.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+        command.add_argument("--parse-cache", default=None, help="sqlite file persisting parsed inline markdown")
+    build.add_argument("--force", action="store_true", help="render every page, even unchanged ones")
+    build.add_argument(
+        "--io-threads", type=int, default=0,
+        help="threads per render process reading and writing files in the background, for slow storage (default: 0)",
+    )
+    build.add_argument(
+        "--check-links", action="store_true",
+        help="check internal links and images against the output, list external URLs; exit 1 if any are broken",
+    )
+    build.add_argument("--profile", default=None, help="write per-stage timings to this JSON file and print a report")
+    serve_command.add_argument("--port", type=int, default=8888, help="HTTP port")
+    serve_command.add_argument("--watch", action="store_true", help="re-render pages when their sources change")
+    serve_command.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changes")
+    serve_command.add_argument("--poll", action="store_true", help="watch by polling instead of inotify")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        profile = Profiler() if args.profile else None
+        result = build_site(
+            args.content, args.output, args.template, args.workers, args.force, args.parse_cache, profile,
+            args.io_threads, args.static,
+        )
+        print(
+            f"Built {len(result.rendered)} pages ({len(result.skipped)} unchanged, "
+            f"{len(result.removed)} removed) in {time.perf_counter() - start:.2f}s"
+        )
+        if result.rendered:
+            print(f"I/O: {result.io}")
+        if result.assets is not None and (result.assets.placed or result.assets.removed):
+            print(
+                f"Assets: {len(result.assets.placed)} files placed ({len(result.assets.skipped)} unchanged, "
+                f"{len(result.assets.removed)} removed)"
+            )
+        if profile is not None:
+            profile.dump(args.profile)
+            print(profile.report())
+        if args.check_links:
+            report = check_links(load_manifest(args.output), args.output)
+            for page, url, text in report.broken:
+                print(f"{page}: broken link {url} ({text!r})")
+            print(
+                f"Checked {report.checked} links: {len(report.broken)} broken, "
+                f"{len(report.external)} external URLs not fetched"
+            )
+            if report.broken:
+                return 1
+    elif args.command == "why":
+        try:
+            reason, inputs = why(load_manifest(args.output), args.page)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        print(f"{args.page}: {reason}")
+        for item in inputs:
+            print(f"  depends on {item}")
+    elif args.command == "serve":
+        serve(
+            args.content, args.output, args.template, args.port, args.watch, args.interval,
+            args.poll, args.workers, args.parse_cache, args.static,
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
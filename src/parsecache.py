@@ -0,0 +1,117 @@
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+
+from textnode import TextNode, TextType
+from delimiter import text_to_textnodes
+
+# Version of the parser output kept in the disk store, stored as the database's user_version.
+# Bump it whenever text_to_textnodes or the stored format changes, so older entries are dropped.
+PARSER_VERSION = 1
+
+def text_key(text):
+    #Returns the cache key of a piece of inline markdown
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+class ParseCache():
+    #Caches text_to_textnodes results keyed by a hash of the input text.
+    #Entries live in a bounded in-memory LRU and, when path is given, in a sqlite file
+    #so repeated paragraphs are parsed once per build, or once ever.
+    #A disk store written by another PARSER_VERSION is emptied when opened.
+    #New entries are held in memory and written in one short transaction by flush, so pool workers
+    #sharing the file only wait on each other while one of them flushes.
+
+    # Pending disk writes are flushed once this many have accumulated
+    COMMIT_EVERY = 256
+
+    def __init__(self, maxsize=4096, path=None):
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # {key: encoded runs} not yet written to the disk store
+        self._pending = {}
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=30)
+            # Readers neither block nor are blocked by a flush in another process
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS textnodes (key BLOB PRIMARY KEY, runs TEXT NOT NULL)")
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != PARSER_VERSION:
+                self._db.execute("DELETE FROM textnodes")
+                self._db.execute(f"PRAGMA user_version = {PARSER_VERSION}")
+                self._db.commit()
+
+    def text_to_textnodes(self, text):
+        #Same result as delimiter.text_to_textnodes, served from the cache when possible
+
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+
+        key = text_key(text)
+        runs = self._entries.get(key)
+        if runs is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            runs = self._load(key)
+            if runs is None:
+                self.misses += 1
+                runs = tuple((node.text, node.text_type, node.url) for node in text_to_textnodes(text))
+                self._store(key, runs)
+            else:
+                self.hits += 1
+            self._entries[key] = runs
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        # Fresh nodes every time, callers are free to modify what they get back
+        return [TextNode(text, text_type, url) for text, text_type, url in runs]
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT runs FROM textnodes WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return tuple((text, TextType(value), url) for text, value, url in json.loads(row[0]))
+
+    def _store(self, key, runs):
+        if self._db is None:
+            return
+        encoded = json.dumps([(text, text_type.value, url) for text, text_type, url in runs])
+        self._pending[key] = encoded
+        if len(self._pending) >= self.COMMIT_EVERY:
+            self.flush()
+
+    def flush(self):
+        #Writes pending entries to the disk store, holding its write lock only for this transaction
+        if self._db is not None and self._pending:
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO textnodes (key, runs) VALUES (?, ?)", self._pending.items()
+                )
+            self._pending = {}
+
+    def clear(self):
+        #Empties the in-memory LRU, the disk store is kept
+        self._entries.clear()
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,136 @@
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# The Profiler receiving measurements, None while profiling is off
+_active = None
+
+class Profiler():
+    #Collects wall time, call counts and node counts per stage, per page and in aggregate.
+    #Stages nest: time spent in "parse" is also part of an enclosing "blocks".
+    #I/O throughput, measured on separate threads, is kept in io (a fileio.IOStats) when set.
+
+    def __init__(self):
+        self.io = None
+        self.totals = {}
+        self.pages = {}
+        self._page = None
+        self._page_stages = None
+        self._page_start = None
+
+    def record(self, stage, seconds, nodes=0):
+        #Adds one call of stage to the current page, or to the totals outside of a page
+        stages = self.totals if self._page is None else self._page_stages
+        entry = stages.get(stage)
+        if entry is None:
+            stages[stage] = [seconds, 1, nodes]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+            entry[2] += nodes
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def start_page(self, page):
+        self._page = page
+        self._page_stages = {}
+        self._page_start = time.perf_counter()
+
+    def pop_page(self):
+        #Ends the current page and returns (page, seconds, stages) without storing it,
+        #so pages measured in worker processes can be sent back and stored with add_page
+        page = (self._page, time.perf_counter() - self._page_start, self._page_stages)
+        self._page = self._page_stages = self._page_start = None
+        return page
+
+    def add_page(self, page, seconds, stages):
+        #Stores a page's measurements and adds them to the totals
+        self.pages[page] = {"seconds": seconds, "stages": stages}
+        for stage, (stage_seconds, calls, nodes) in stages.items():
+            entry = self.totals.setdefault(stage, [0.0, 0, 0])
+            entry[0] += stage_seconds
+            entry[1] += calls
+            entry[2] += nodes
+
+    def slowest_pages(self, count=10):
+        return sorted(self.pages.items(), key=lambda item: item[1]["seconds"], reverse=True)[:count]
+
+    def to_dict(self):
+        def stages_dict(stages):
+            return {
+                stage: {"seconds": seconds, "calls": calls, "nodes": nodes}
+                for stage, (seconds, calls, nodes) in stages.items()
+            }
+        return {
+            "io": self.io.to_dict() if self.io is not None else None,
+            "totals": stages_dict(self.totals),
+            "pages": {
+                page: {"seconds": data["seconds"], "stages": stages_dict(data["stages"])}
+                for page, data in self.pages.items()
+            },
+        }
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+
+    def report(self, count=10):
+        #Returns the aggregate stage table followed by the slowest pages
+        lines = [f"{'stage':<12}{'ms':>12}{'calls':>10}{'nodes':>12}"]
+        for stage, (seconds, calls, nodes) in sorted(self.totals.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{stage:<12}{seconds * 1000:>12.2f}{calls:>10}{nodes:>12}")
+
+        columns = ("read", "blocks", "parse", "render", "write")
+        lines.append("")
+        lines.append(f"slowest pages{'ms':>47}" + "".join(f"{column:>10}" for column in columns))
+        for page, data in self.slowest_pages(count):
+            stages = data["stages"]
+            cells = "".join(f"{stages.get(column, (0,))[0] * 1000:>10.2f}" for column in columns)
+            lines.append(f"{page[-48:]:<48}{data['seconds'] * 1000:>12.2f}{cells}")
+
+        if self.io is not None:
+            lines.append("")
+            lines.append(f"I/O threads: {self.io}")
+        return "\n".join(lines)
+
+def enable(profiler=None):
+    #Starts sending measurements to profiler (a new one by default) and returns it
+    global _active
+    _active = profiler if profiler is not None else Profiler()
+    return _active
+
+def disable():
+    global _active
+    _active = None
+
+def active():
+    return _active
+
+def stage(name):
+    #Context manager recording its block as stage while profiling is on
+    if _active is None:
+        return nullcontext()
+    return _active.stage(name)
+
+def instrument(stage, count=None):
+    #Decorator recording each call as stage while profiling is on.
+    #count, if given, maps the result to the number of nodes it allocated.
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            profiler.record(stage, time.perf_counter() - start, count(result) if count else 0)
+            return result
+        return wrapper
+    return decorate
@@ -0,0 +1,127 @@
+import hashlib
+from collections import OrderedDict
+
+from htmlnode import ParentNode, props_items
+from delimiter import text_to_textnodes
+from blocks import block_to_html_node, iter_blocks
+from profiling import instrument
+
+def _bottom_up(node, combine):
+    #Returns combine(node, [results of its children]) computed for every node of the tree from the
+    #leaves up, without recursion
+    order = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        order.append(current)
+        if isinstance(current, ParentNode):
+            stack.extend(current.children or ())
+
+    results = {}
+    for current in reversed(order):
+        children = current.children if isinstance(current, ParentNode) else None
+        results[id(current)] = combine(current, None if children is None else tuple(results[id(child)] for child in children))
+    return results[id(node)]
+
+def _string(value):
+    return None if value is None else str(value)
+
+def _fields(node, children):
+    # Fields as the strings they render to, like props_items
+    return (_string(node.tag), _string(node.value), props_items(node.props), children)
+
+def node_key(node):
+    #Returns the structural key of node: a tuple of its tag, value and props, as strings, and, for a
+    #ParentNode, the keys of its children in order. Keys hash by structure and compare equal exactly
+    #when the HTML is equal.
+    return _bottom_up(node, _fields)
+
+def node_digest(node):
+    #Returns a blake2b digest of the same fields, with children included by their digests,
+    #so it is the same for equal trees in any process
+    def digest(current, children):
+        return hashlib.blake2b(repr(_fields(current, children)).encode("utf-8"), digest_size=16).digest()
+    return _bottom_up(node, digest)
+
+class RenderCache():
+    #Caches rendered HTML of fragments repeated across pages (navigation lists, notes, footers),
+    #so each is rendered once per build and spliced into later pages as finished text.
+    #Node fragments are keyed by structure (see node_key). Walking a tree to key it costs about as
+    #much as rendering it, so markdown is cached per block instead, keyed by the block's type and
+    #lines, which decide its HTML without building any nodes: a hit skips parsing too.
+    #Block HTML depends on the inline parser, so a cache must only be used with one.
+    #Entries live in a bounded LRU holding at most maxsize fragments and max_bytes characters of HTML;
+    #a fragment larger than max_bytes is rendered but not kept.
+
+    def __init__(self, maxsize=4096, max_bytes=8 << 20):
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        # {key: (html, links recorded while rendering it)}
+        self._entries = OrderedDict()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def _store(self, key, html, links=()):
+        if len(html) > self.max_bytes:
+            return
+        self._entries[key] = (html, links)
+        self.size += len(html)
+        while len(self._entries) > self.maxsize or self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def fragment_html(self, node):
+        #Returns node.to_html(), from the cache when a node of the same structure was rendered before
+        key = ("node", node_key(node))
+        entry = self._get(key)
+        if entry is not None:
+            return entry[0]
+        html = node.to_html()
+        self._store(key, html)
+        return html
+
+    @instrument("blocks", count=lambda html: 1)
+    def block_html(self, block_type, lines, inline_parser=text_to_textnodes, links=None):
+        #Returns block_to_html_node(block_type, lines, inline_parser).to_html(), from the cache when
+        #the same block was rendered before. links, a LinkCollector wrapped by inline_parser, gets
+        #the references of a cached block again, as if it had been parsed.
+        key = ("block", block_type, tuple(lines))
+        entry = self._get(key)
+        if entry is not None:
+            if links is not None:
+                links.links.extend(entry[1])
+            return entry[0]
+
+        mark = len(links.links) if links is not None else 0
+        html = block_to_html_node(block_type, lines, inline_parser).to_html()
+        self._store(key, html, tuple(links.links[mark:]) if links is not None else ())
+        return html
+
+    def iter_markdown_html(self, source, inline_parser=text_to_textnodes, links=None):
+        #Yields the HTML of markdown_to_html_node(source, inline_parser) one block at a time,
+        #each through block_html
+        yield "<div>"
+        for block_type, lines in iter_blocks(source):
+            yield self.block_html(block_type, lines, inline_parser, links)
+        yield "</div>"
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,273 @@
+import ctypes
+import ctypes.util
+import functools
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from assets import asset_urls
+from build import build_site, find_pages, load_manifest, save_manifest, update_pages
+from parsecache import ParseCache
+from template import load_template
+
+# inotify event flags, from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+# struct inotify_event header: wd, mask, cookie, len, followed by len bytes of name
+_IN_EVENT = struct.Struct("iIII")
+
+def snapshot(content_dir):
+    #Returns {relative path: (mtime_ns, size)} for every markdown file under content_dir
+    result = {}
+    for relative in find_pages(content_dir):
+        try:
+            stat = os.stat(os.path.join(content_dir, relative))
+        except FileNotFoundError:
+            continue
+        result[relative] = (stat.st_mtime_ns, stat.st_size)
+    return result
+
+class PollingWatcher():
+    #Finds changed markdown files by comparing stat snapshots of the content tree
+
+    def __init__(self, content_dir, interval=0.5):
+        self.content_dir = content_dir
+        self.interval = interval
+        self._snapshot = snapshot(content_dir)
+
+    def changes(self, timeout):
+        #Waits up to timeout seconds and returns the pages that were changed, added or removed
+        deadline = time.monotonic() + timeout
+        while True:
+            current = snapshot(self.content_dir)
+            changed = {relative for relative, stat in current.items() if self._snapshot.get(relative) != stat}
+            changed.update(relative for relative in self._snapshot if relative not in current)
+            self._snapshot = current
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+class InotifyWatcher():
+    #Finds changed markdown files from Linux inotify events, without rescanning the tree.
+    #Raises OSError where inotify is unavailable.
+
+    # After the first event, keep collecting for this long so multi-step saves arrive together
+    SETTLE = 0.01
+
+    def __init__(self, content_dir):
+        path = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(path, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.content_dir = content_dir
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        self._watch_tree(content_dir)
+
+    def _watch_tree(self, path):
+        for root, dirs, files in os.walk(path):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), _IN_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {root}")
+            self._dirs[wd] = os.path.relpath(root, self.content_dir)
+
+    def changes(self, timeout):
+        #Waits up to timeout seconds and returns the pages that were changed, added or removed.
+        #A removed directory is reported as its own relative path.
+        changed = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                data = b""
+            self._read_events(data, changed)
+            ready, _, _ = select.select([self._fd], [], [], self.SETTLE)
+        return changed
+
+    def _read_events(self, data, changed):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _IN_EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _IN_EVENT.size:offset + _IN_EVENT.size + length].rstrip(b"\0"))
+            offset += _IN_EVENT.size + length
+
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or name == "":
+                continue
+            relative = name if directory == "." else os.path.join(directory, name)
+
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    # New directories need watches of their own, and may already hold pages
+                    path = os.path.join(self.content_dir, relative)
+                    self._watch_tree(path)
+                    changed.update(os.path.join(relative, page) for page in find_pages(path))
+                else:
+                    changed.add(relative)
+            elif name.endswith(".md"):
+                changed.add(relative)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def make_watcher(content_dir, interval=0.5, polling=False):
+    #Returns an inotify watcher where available, a polling watcher otherwise
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(content_dir)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(content_dir, interval)
+
+class SiteWatcher():
+    #Keeps the manifest, template and parse cache of a built site in memory
+    #and re-renders only the pages whose sources change.
+    #The manifest is written back by close(); if that never happens the next build
+    #re-renders the affected pages, since their hashes no longer match.
+    #Pages that fail to render are reported through log and left for the next save to fix;
+    #workers is passed to the full build run when the template changes.
+
+    def __init__(self, content_dir, output_dir, template_path, interval=0.5, polling=False, parse_cache=None,
+                 workers=None, log=print):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.template_path = template_path
+        self.parse_cache = parse_cache
+        self.workers = workers
+        self.log = log
+        self.manifest = load_manifest(output_dir)
+        self.template = None
+        self._read_template()
+        self._cache = ParseCache(path=parse_cache)
+        self._watcher = make_watcher(content_dir, interval, polling)
+        self._dirty = False
+
+    def _read_template(self):
+        #Picks up edits to the template, returns whether it changed
+        template = load_template(self.template_path)
+        changed = template is not self.template
+        self.template = template
+        return changed
+
+    def _expand(self, changed):
+        #Replaces directories in changed with the pages they hold, or held
+        pages = set()
+        for relative in changed:
+            if relative.endswith(".md"):
+                pages.add(relative)
+                continue
+            prefix = relative + os.sep
+            pages.update(page for page in self.manifest["pages"] if page.startswith(prefix))
+            path = os.path.join(self.content_dir, relative)
+            if os.path.isdir(path):
+                pages.update(os.path.join(relative, page) for page in find_pages(path))
+        return pages
+
+    def poll(self, timeout):
+        #Waits up to timeout seconds for changes and renders them.
+        #Returns a BuildResult, or None when nothing changed.
+        changed = self._watcher.changes(timeout)
+
+        if self._read_template():
+            # Every page depends on the template, let the full build redo them all
+            self._flush()
+            try:
+                result = build_site(
+                    self.content_dir, self.output_dir, self.template_path, self.workers, parse_cache=self.parse_cache,
+                )
+            except (OSError, ValueError) as error:
+                # The manifest is only saved by a build that completes, so the next one starts over
+                self.log(f"Rebuild failed: {error}")
+                result = None
+            self.manifest = load_manifest(self.output_dir)
+            return result
+
+        if not changed:
+            return None
+        self._dirty = True
+        result = update_pages(
+            self.content_dir, self.output_dir, self.template, self.manifest,
+            self._expand(changed), self._cache.text_to_textnodes, asset_urls(self.manifest.get("assets", {})),
+        )
+        for page, error in result.errors:
+            self.log(f"Cannot render {page}: {error}")
+        return result
+
+    def _flush(self):
+        if self._dirty:
+            save_manifest(self.output_dir, self.manifest)
+            self._dirty = False
+        self._cache.flush()
+
+    def close(self):
+        self._flush()
+        self._cache.close()
+        self._watcher.close()
+
+def make_server(output_dir, port, host="127.0.0.1"):
+    #Returns an HTTP server for the output directory
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=output_dir)
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(content_dir, output_dir, template_path, port=8888, watch=False, interval=0.5,
+          polling=False, workers=None, parse_cache=None, static_dir=None, log=print):
+    #Builds the site and serves output_dir over HTTP until interrupted.
+    #With watch=True, changed sources are re-rendered as soon as they are saved.
+
+    result = build_site(content_dir, output_dir, template_path, workers, parse_cache=parse_cache, static_dir=static_dir)
+    log(f"Built {len(result.rendered)} pages ({len(result.skipped)} unchanged)")
+
+    server = make_server(output_dir, port)
+    log(f"Serving {output_dir} at http://{server.server_address[0]}:{server.server_address[1]}/")
+
+    if not watch:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    watcher = SiteWatcher(content_dir, output_dir, template_path, interval, polling, parse_cache, workers, log)
+    try:
+        while True:
+            try:
+                result = watcher.poll(interval)
+            except (OSError, ValueError) as error:
+                # e.g. the template being replaced; keep serving and pick it up on the next change
+                log(f"Rebuild failed: {error}")
+                continue
+            if result is not None and (result.rendered or result.removed):
+                log(f"Rebuilt {len(result.rendered)} pages, removed {len(result.removed)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+
+class SiteTestCase(unittest.TestCase):
+    #Sets up a site in a temporary directory for each test: pages under content, static files under
+    #static, a page template at template.html and public for the output, as the build expects them.
+    #Subclasses set PAGES and ASSETS ({relative path: text}) and TEMPLATE to what their tests need.
+
+    TEMPLATE = "{{ Content }}"
+    PAGES = {}
+    ASSETS = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w") as f:
+            f.write(self.TEMPLATE)
+        for name, text in self.PAGES.items():
+            self.write(name, text)
+        for name, text in self.ASSETS.items():
+            self.write_asset(name, text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def write(self, name, text):
+        #Writes a page under the content directory
+        self._write(os.path.join(self.content, name), text)
+
+    def write_asset(self, name, text):
+        #Writes a file under the static directory
+        self._write(os.path.join(self.static, name), text)
+
+    def read(self, name):
+        #Returns an output file
+        with open(os.path.join(self.output, name)) as f:
+            return f.read()
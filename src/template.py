@@ -0,0 +1,76 @@
+import io
+import os
+import re
+
+from htmlnode import HTMLNode
+
+# A slot is a name between double braces, e.g. {{ Title }}
+_SLOT_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Parsed templates by path, with the (mtime_ns, size) they were parsed at
+_templates = {}
+
+class Template():
+    #A page layout parsed once into static chunks and the named slots between them.
+    #Pages are rendered by writing the chunks and slot values straight to a file,
+    #without searching or copying the template text again.
+
+    def __init__(self, text):
+        if not isinstance(text, str):
+            raise ValueError("text must be a string")
+        self.text = text
+        # (static text, slot name or None) pairs, in order
+        self.parts = []
+        pos = 0
+        for match in _SLOT_RE.finditer(text):
+            self.parts.append((text[pos:match.start()], match.group(1)))
+            pos = match.end()
+        self.parts.append((text[pos:], None))
+
+    @property
+    def slots(self):
+        return [slot for _, slot in self.parts if slot is not None]
+
+    def render_to(self, fp, values):
+        #Writes the page to a file-like object.
+        #Slot values may be strings, HTMLNodes (streamed with write_html)
+        #or iterables of HTMLNodes and strings, e.g. generators producing the page as it is written.
+        for static, slot in self.parts:
+            if static:
+                fp.write(static)
+            if slot is None:
+                continue
+            if slot not in values:
+                raise ValueError(f"missing value for template slot {slot}")
+            value = values[slot]
+            if isinstance(value, str):
+                fp.write(value)
+            elif isinstance(value, HTMLNode):
+                value.write_html(fp)
+            else:
+                for item in value:
+                    if isinstance(item, str):
+                        fp.write(item)
+                    else:
+                        item.write_html(fp)
+
+    def render(self, values):
+        #Returns the page as a string
+        buffer = io.StringIO()
+        self.render_to(buffer, values)
+        return buffer.getvalue()
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+def load_template(path):
+    #Returns the parsed template at path, parsing it again only when the file changes
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _templates.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, encoding="utf-8") as f:
+        template = Template(f.read())
+    _templates[path] = (key, template)
+    return template
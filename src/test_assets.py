@@ -0,0 +1,102 @@
+import os
+import unittest
+
+from assets import asset_parser, asset_urls, copy_assets, hashed_name, place_file
+from delimiter import text_to_textnodes
+from textnode import TextNode, TextType
+from sitetest import SiteTestCase
+
+
+class TestAssets(SiteTestCase):
+
+    ASSETS = {"index.css": "body {}", "images/cat.png": "meow"}
+
+    # Test content-hashed names keep the directory and extension
+    def test_hashed_name(self):
+        self.assertEqual(hashed_name(os.path.join("images", "cat.png"), "0123456789abcdef"), os.path.join("images", "cat.0123456789ab.png"))
+        self.assertEqual(hashed_name("LICENSE", "0123456789abcdef"), "LICENSE.0123456789ab")
+
+    # Test placing a file by hardlink or, when not allowed, by reflink or copy
+    def test_place_file(self):
+        source = os.path.join(self.static, "index.css")
+        linked = os.path.join(self.output, "linked.css")
+        copied = os.path.join(self.output, "copied.css")
+        self.assertEqual(place_file(source, linked), "link")
+        self.assertTrue(os.path.samefile(source, linked))
+        self.assertIn(place_file(source, copied, link=False), ("reflink", "copy"))
+        self.assertFalse(os.path.samefile(source, copied))
+        self.assertEqual(self.read("copied.css"), "body {}")
+        self.assertEqual(sorted(os.listdir(self.output)), ["copied.css", "linked.css"])
+
+    # Test placing a file over a hardlink to it leaves no temporary file behind
+    def test_place_file_already_linked(self):
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.output, "index.css")
+        os.makedirs(self.output)
+        os.link(source, dest)
+        self.assertEqual(place_file(source, dest), "link")
+        self.assertEqual(os.listdir(self.output), ["index.css"])
+
+    # Test editing a source in place rebuilds without stray files and leaves old hashed copies as they were
+    def test_copy_assets_edited_in_place(self):
+        entries, _ = copy_assets(self.static, self.output, {})
+        cat = entries[os.path.join("images", "cat.png")]["output"]
+        self.assertFalse(os.path.samefile(os.path.join(self.static, "images", "cat.png"), os.path.join(self.output, cat)))
+        self.write_asset("images/cat.png", "purr")
+        self.assertEqual(self.read(cat), "meow")
+
+        entries, _ = copy_assets(self.static, self.output, entries)
+        new_cat = entries[os.path.join("images", "cat.png")]["output"]
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, "images"))), sorted(["cat.png", os.path.basename(new_cat)]))
+        self.assertEqual(self.read(new_cat), "purr")
+
+    # Test assets are placed under both names, then skipped while unchanged
+    def test_copy_assets(self):
+        entries, result = copy_assets(self.static, self.output, {})
+        cat = entries[os.path.join("images", "cat.png")]["output"]
+        self.assertEqual(self.read(os.path.join("images", "cat.png")), "meow")
+        self.assertEqual(self.read(cat), "meow")
+        self.assertEqual(len(result.placed), 4)
+
+        entries, result = copy_assets(self.static, self.output, entries)
+        self.assertEqual((result.placed, len(result.skipped)), ([], 4))
+
+    # Test a changed asset gets a new hashed name and a deleted one is removed
+    def test_copy_assets_changed_and_removed(self):
+        entries, _ = copy_assets(self.static, self.output, {})
+        old_cat = entries[os.path.join("images", "cat.png")]["output"]
+        self.write_asset("images/cat.png", "purr")
+        os.remove(os.path.join(self.static, "index.css"))
+
+        entries, result = copy_assets(self.static, self.output, entries)
+        new_cat = entries[os.path.join("images", "cat.png")]["output"]
+        self.assertNotEqual(new_cat, old_cat)
+        self.assertEqual(self.read(new_cat), "purr")
+        self.assertFalse(os.path.exists(os.path.join(self.output, old_cat)))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.css")))
+        self.assertEqual(len(result.removed), 2)
+        self.assertNotIn("index.css", entries)
+
+    # Test rewriting image URLs that name an asset
+    def test_asset_parser(self):
+        entries, _ = copy_assets(self.static, self.output, {})
+        urls = asset_urls(entries)
+        hashed = "/" + entries[os.path.join("images", "cat.png")]["output"].replace(os.sep, "/")
+        self.assertEqual(urls["/images/cat.png"], hashed)
+
+        parse = asset_parser(text_to_textnodes, urls)
+        self.assertEqual(
+            parse("![cat](/images/cat.png) ![dog](/images/dog.png) [cat](/images/cat.png)"),
+            [
+                TextNode("cat", TextType.IMAGE, hashed),
+                TextNode(" ", TextType.NORMAL),
+                TextNode("dog", TextType.IMAGE, "/images/dog.png"),
+                TextNode(" ", TextType.NORMAL),
+                TextNode("cat", TextType.LINK, "/images/cat.png"),
+            ],
+        )
+        self.assertIs(asset_parser(text_to_textnodes, {}), text_to_textnodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import io
+import unittest
+
+from blocks import BlockType, block_to_block_type, iter_blocks, iter_html_nodes, iter_markdown_html, markdown_to_html_node
+
+
+class TestBlocks(unittest.TestCase):
+
+    # Test block classification
+    def test_block_to_block_type(self):
+        self.assertEqual(block_to_block_type(["# Heading"]), BlockType.HEADING)
+        self.assertEqual(block_to_block_type(["###### Heading"]), BlockType.HEADING)
+        self.assertEqual(block_to_block_type(["####### Heading"]), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type(["> one", "> two"]), BlockType.QUOTE)
+        self.assertEqual(block_to_block_type(["- one", "* two"]), BlockType.UNORDERED_LIST)
+        self.assertEqual(block_to_block_type(["1. one", "2. two"]), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type(["1. one", "3. two"]), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type(["> one", "two"]), BlockType.PARAGRAPH)
+
+    # Test block classification with invalid input
+    def test_block_to_block_type_empty(self):
+        with self.assertRaises(ValueError):
+            block_to_block_type([])
+
+    # Test blocks are split on blank lines, but not inside code
+    def test_iter_blocks(self):
+        markdown = "# Title\n\nSome text\nmore text\n\n```\ncode\n\nmore code\n```\n\n- a\n- b\n"
+        blocks = list(iter_blocks(markdown))
+        self.assertListEqual(
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.PARAGRAPH, ["Some text", "more text"]),
+                (BlockType.CODE, ["```", "code", "", "more code", "```"]),
+                (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+            ],
+            blocks,
+        )
+
+    # Test reading from a file-like object
+    def test_iter_blocks_file(self):
+        blocks = list(iter_blocks(io.StringIO("para one\r\n\r\n> quote\r\n")))
+        self.assertListEqual(
+            [(BlockType.PARAGRAPH, ["para one"]), (BlockType.QUOTE, ["> quote"])],
+            blocks,
+        )
+
+    # Test paragraphs with inline markdown
+    def test_paragraphs(self):
+        markdown = "This is **bolded** paragraph\ntext in a p\ntag here\n\nThis is another paragraph with _italic_ text and `code` here\n"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p></div>",
+        )
+
+    # Test code blocks keep their text as is
+    def test_codeblock(self):
+        markdown = "```\nThis is text that _should_ remain\nthe **same** even with inline stuff\n```\n"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
+        )
+
+    # Test headings, quotes and lists
+    def test_headings_quotes_lists(self):
+        markdown = "## Heading with [link](https://example.com)\n\n> a quote\n> continued\n\n- one\n- **two**\n\n1. first\n2. second\n"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(
+            node.to_html(),
+            '<div><h2>Heading with <a href="https://example.com">link</a></h2>'
+            "<blockquote>a quote continued</blockquote>"
+            "<ul><li>one</li><li><b>two</b></li></ul>"
+            "<ol><li>first</li><li>second</li></ol></div>",
+        )
+
+    # Test streaming nodes one block at a time
+    def test_iter_html_nodes(self):
+        nodes = iter_html_nodes("# One\n\n# Two\n")
+        self.assertEqual(next(nodes).to_html(), "<h1>One</h1>")
+        self.assertEqual(next(nodes).to_html(), "<h1>Two</h1>")
+        with self.assertRaises(StopIteration):
+            next(nodes)
+
+    # Test streaming the HTML of a whole document
+    def test_iter_markdown_html(self):
+        markdown = "# One\n\nSome `code` and **bold**\n\n```\nx = 1\n```\n\n1. a\n2. b\n"
+        self.assertEqual("".join(iter_markdown_html(markdown)), markdown_to_html_node(markdown).to_html())
+        self.assertEqual("".join(iter_markdown_html(io.StringIO(markdown))), markdown_to_html_node(markdown).to_html())
+        self.assertEqual("".join(iter_markdown_html("")), "<div></div>")
+
+    # Test an empty document
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html_node("").to_html(), "<div></div>")
+
+    # Test with a non-string argument
+    def test_invalid_argument(self):
+        with self.assertRaises(ValueError):
+            markdown_to_html_node(12345)
+
+
+if __name__ == "__main__":
+    unittest.main()
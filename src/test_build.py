@@ -0,0 +1,155 @@
+import os
+import unittest
+from unittest import mock
+
+import build
+from build import build_site, extract_title, output_path, render_page, stream_page
+from template import Template
+from sitetest import SiteTestCase
+
+
+class TestBuild(SiteTestCase):
+
+    TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+    PAGES = {"index.md": "# Home\n\nHello **world**\n", "blog/post.md": "# Post\n\n- one\n- two\n"}
+
+    # Test extracting the title
+    def test_extract_title(self):
+        self.assertEqual(extract_title("intro\n\n#  Hello  \n\n# Other"), "Hello")
+
+    # Test extracting the title without a heading
+    def test_extract_title_missing(self):
+        with self.assertRaises(ValueError):
+            extract_title("## Not a title")
+
+    # Test mapping a source to its output
+    def test_output_path(self):
+        self.assertEqual(output_path("content/a/b.md", "content", "public"), os.path.join("public", "a", "b.html"))
+
+    # Test a build in the current process
+    def test_build_single_worker(self):
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(len(result.rendered), 2)
+        self.assertEqual(self.read("index.html"), "<title>Home</title><body><div><h1>Home</h1><p>Hello <b>world</b></p></div></body>")
+        self.assertEqual(self.read("blog/post.html"), "<title>Post</title><body><div><h1>Post</h1><ul><li>one</li><li>two</li></ul></div></body>")
+        self.assertEqual((result.io.files_read, result.io.files_written), (2, 2))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, "blog"))), ["post.html"])
+
+    # Test a build without I/O threads streams pages into their files instead of building strings
+    def test_build_without_io_threads(self):
+        with mock.patch.object(Template, "render", side_effect=AssertionError("page built as a string")):
+            result = build_site(self.content, self.output, self.template, workers=1, io_threads=0)
+        self.assertEqual(self.read("index.html"), "<title>Home</title><body><div><h1>Home</h1><p>Hello <b>world</b></p></div></body>")
+        self.assertEqual((result.io.files_read, result.io.files_written), (2, 2))
+
+    # Test a build across a process pool gives the same output
+    def test_build_process_pool(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        expected = self.read("index.html"), self.read("blog/post.html")
+        result = build_site(self.content, self.output, self.template, workers=2, force=True, io_threads=2)
+        self.assertEqual((self.read("index.html"), self.read("blog/post.html")), expected)
+        self.assertEqual((result.io.files_read, result.io.files_written), (2, 2))
+
+    # Test pages streamed by a build are counted in its I/O stats
+    def test_build_stream_stats(self):
+        with mock.patch.object(build, "STREAM_THRESHOLD", 1):
+            result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual((result.io.files_read, result.io.files_written), (2, 2))
+        sizes = [os.path.getsize(os.path.join(self.output, name)) for name in ("index.html", "blog/post.html")]
+        self.assertEqual(result.io.bytes_written, sum(sizes))
+        self.assertEqual(result.io.bytes_read, len("# Home\n\nHello **world**\n") + len("# Post\n\n- one\n- two\n"))
+
+    # Test streaming a page through a memory map gives the same output as reading it whole
+    def test_stream_page(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.write("big.md", "intro\r\n\r\n# Big\r\n\r\n" + "Some _text_ with a [link](/a)\n\n" * 50 + "```\ncode\n```\n")
+        source = os.path.join(self.content, "big.md")
+        render_page(source, os.path.join(self.output, "whole.html"), template, stream_threshold=None)
+        stream_page(source, os.path.join(self.output, "streamed.html"), template)
+        self.assertEqual(self.read("streamed.html"), self.read("whole.html"))
+        self.assertIn("<title>Big</title>", self.read("streamed.html"))
+
+        # Sources over the threshold are streamed by render_page too
+        render_page(source, os.path.join(self.output, "threshold.html"), template, stream_threshold=1)
+        self.assertEqual(self.read("threshold.html"), self.read("whole.html"))
+
+    # Test streaming a page without a title
+    def test_stream_page_missing_title(self):
+        template = Template("{{ Title }}{{ Content }}")
+        self.write("untitled.md", "## Not a title\n")
+        self.write("empty.md", "")
+        for name in ("untitled.md", "empty.md"):
+            with self.assertRaises(ValueError):
+                stream_page(os.path.join(self.content, name), os.path.join(self.output, "x.html"), template)
+
+    # Test unchanged pages are skipped on the next build
+    def test_incremental_build(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(result.rendered, [])
+        self.assertEqual(len(result.skipped), 2)
+
+        self.write("blog/post.md", "# Post\n\nChanged\n")
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(result.rendered, [os.path.join(self.output, "blog", "post.html")])
+        self.assertEqual(self.read("blog/post.html"), "<title>Post</title><body><div><h1>Post</h1><p>Changed</p></div></body>")
+
+    # Test a template change renders every page
+    def test_incremental_build_template_change(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(len(result.rendered), 2)
+        self.assertEqual(self.read("index.html"), "<div><h1>Home</h1><p>Hello <b>world</b></p></div>")
+
+    # Test a missing output is rendered again and a deleted source is removed
+    def test_incremental_build_missing_and_removed(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        os.remove(os.path.join(self.output, "index.html"))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(result.rendered, [os.path.join(self.output, "index.html")])
+        self.assertEqual(result.removed, [os.path.join(self.output, "blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog", "post.html")))
+
+    # Test a build through a persistent parse cache gives the same output
+    def test_build_parse_cache(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        expected = self.read("index.html")
+        cache_path = os.path.join(self.tmp.name, "cache.sqlite")
+        build_site(self.content, self.output, self.template, workers=1, force=True, parse_cache=cache_path)
+        build_site(self.content, self.output, self.template, workers=1, force=True, parse_cache=cache_path)
+        self.assertEqual(self.read("index.html"), expected)
+        self.assertTrue(os.path.exists(cache_path))
+
+    # Test static files are copied and images pointing at them get content-hashed URLs
+    def test_build_static(self):
+        self.write_asset("images/cat.png", "meow")
+        self.write("cat.md", "# Cat\n\n![cat](/images/cat.png)\n")
+
+        result = build_site(self.content, self.output, self.template, workers=1, static_dir=self.static)
+        self.assertEqual(len(result.assets.placed), 2)
+        self.assertEqual(self.read("images/cat.png"), "meow")
+        first = self.read("cat.html")
+        self.assertRegex(first, r'<img src="/images/cat\.[0-9a-f]{12}\.png" alt="cat">')
+
+        # Unchanged assets and pages are skipped, also by builds that leave assets alone
+        result = build_site(self.content, self.output, self.template, workers=1, static_dir=self.static)
+        self.assertEqual((result.rendered, result.assets.placed), ([], []))
+        self.assertEqual(build_site(self.content, self.output, self.template, workers=1).rendered, [])
+
+        # A changed asset renames its hashed copy, so the pages showing it are rendered again
+        self.write_asset("images/cat.png", "purr")
+        result = build_site(self.content, self.output, self.template, workers=1, static_dir=self.static)
+        self.assertEqual(result.rendered, [os.path.join(self.output, "cat.html")])
+        self.assertNotEqual(self.read("cat.html"), first)
+
+    # Test an invalid worker count
+    def test_build_invalid_workers(self):
+        with self.assertRaises(ValueError):
+            build_site(self.content, self.output, self.template, workers=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
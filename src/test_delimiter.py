@@ -91,6 +91,41 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         self.assertEqual(new_nodes_italic[4].text, " test")
         self.assertEqual(new_nodes_italic[4].text_type, TextType.NORMAL)
 
+    # Test splitting every pair in one pass
+    def test_split_nodes_delimiter_all_pairs(self):
+        old_nodes = [TextNode("a **b** c **d** e", TextType.NORMAL)]
+        new_nodes = split_nodes_delimiter(old_nodes, "**", TextType.BOLD, all_pairs=True)
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.NORMAL),
+                TextNode("b", TextType.BOLD),
+                TextNode(" c ", TextType.NORMAL),
+                TextNode("d", TextType.BOLD),
+                TextNode(" e", TextType.NORMAL),
+            ],
+            new_nodes,
+        )
+
+    # Test all_pairs leaves an unclosed delimiter in the text
+    def test_split_nodes_delimiter_all_pairs_unclosed(self):
+        old_nodes = [TextNode("`a` and `b", TextType.NORMAL)]
+        new_nodes = split_nodes_delimiter(old_nodes, "`", TextType.CODE, all_pairs=True)
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.CODE),
+                TextNode(" and `b", TextType.NORMAL),
+            ],
+            new_nodes,
+        )
+
+    # Test all_pairs reuses nodes without delimiters
+    def test_split_nodes_delimiter_all_pairs_no_delimiter(self):
+        node = TextNode("plain", TextType.NORMAL)
+        bold = TextNode("bold", TextType.BOLD)
+        new_nodes = split_nodes_delimiter([node, bold], "_", TextType.ITALIC, all_pairs=True)
+        self.assertIs(new_nodes[0], node)
+        self.assertIs(new_nodes[1], bold)
+
     # Test two images split
     def test_split_images(self):
         node = TextNode(
@@ -189,6 +224,36 @@ class TestSplitNodesDelimiter(unittest.TestCase):
             new_nodes,
         )
     
+    # Test with many links and trailing text
+    def test_split_links_many(self):
+        text = " and ".join(f"[link{i}](https://example.com/{i})" for i in range(100)) + " end"
+        new_nodes = split_nodes_link([TextNode(text, TextType.NORMAL)])
+        self.assertEqual(len(new_nodes), 200)
+        self.assertEqual(new_nodes[0], TextNode("link0", TextType.LINK, "https://example.com/0"))
+        self.assertEqual(new_nodes[-2], TextNode("link99", TextType.LINK, "https://example.com/99"))
+        self.assertEqual(new_nodes[-1], TextNode(" end", TextType.NORMAL))
+
+    # Test images and links split in one pass
+    def test_split_nodes_image_link(self):
+        node = TextNode(
+            "An ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://example.com) end",
+            TextType.NORMAL,
+        )
+        self.assertListEqual(
+            split_nodes_link(split_nodes_image([node])),
+            split_nodes_image_link([node]),
+        )
+        nodes = [TextNode("[a](/a)![b](/b.png)", TextType.NORMAL), TextNode("bold", TextType.BOLD)]
+        self.assertListEqual(
+            split_nodes_image_link(nodes),
+            [TextNode("a", TextType.LINK, "/a"), TextNode("b", TextType.IMAGE, "/b.png"), nodes[1]],
+        )
+
+    # Test split_nodes_link leaves images alone
+    def test_split_links_ignores_images(self):
+        node = TextNode("An ![image](https://i.imgur.com/zjjcJKZ.png)", TextType.NORMAL)
+        self.assertListEqual([node], split_nodes_link([node]))
+
     #Test input node with different texttype
     def test_split_links_different_texttype(self):
         node = TextNode("Bold text", TextType.BOLD)
@@ -239,4 +304,123 @@ class TestSplitNodesDelimiter(unittest.TestCase):
         self.assertEqual(nodes[3].url, "https://i.imgur.com/zjjcJKZ.png")
         self.assertEqual(nodes[4].text, " text")
         self.assertEqual(nodes[4].text_type, TextType.NORMAL)
-    
\ No newline at end of file
+    
+
+def multipass_text_to_textnodes(text):
+    # Reference pipeline the single-pass scanner replaced
+    if text == "":
+        return []
+    nodes = [TextNode(text, TextType.NORMAL)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+class TestTextToTextNodesSinglePass(unittest.TestCase):
+
+    # Inputs taken from the cases above
+    cases = [
+        "",
+        "This is normal text",
+        "**This is bold text**",
+        "This is **bold** text",
+        "This is **bold** test",
+        "This is _italic_ test",
+        "This is `code` test",
+        "This is **bold** and _italic_ test",
+        "This is **bold** and ![image](https://i.imgur.com/zjjcJKZ.png) text",
+        "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and another ![second image](https://i.imgur.com/3elNhQu.png)",
+        "This is text with a [link](https://example.com) and another [second link](https://example2.com)",
+        "This is some text with a [link [nested]](https://example.com)",
+        "This is some text with a [link1](https://example.com)[link2](https://example2.com)",
+        "This is some plain text",
+    ]
+
+    # Test the scanner against the five-pass pipeline
+    def test_matches_multipass_pipeline(self):
+        for text in self.cases:
+            with self.subTest(text=text):
+                self.assertListEqual(multipass_text_to_textnodes(text), text_to_textnodes(text))
+
+    # Test every pair is split, not only the first one
+    def test_repeated_delimiters(self):
+        nodes = text_to_textnodes("a **b** c **d** e")
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.NORMAL),
+                TextNode("b", TextType.BOLD),
+                TextNode(" c ", TextType.NORMAL),
+                TextNode("d", TextType.BOLD),
+                TextNode(" e", TextType.NORMAL),
+            ],
+            nodes,
+        )
+
+    # Test unmatched delimiters stay in the text
+    def test_unmatched_delimiter(self):
+        nodes = text_to_textnodes("a ** b _c_")
+        self.assertListEqual(
+            [
+                TextNode("a ** b ", TextType.NORMAL),
+                TextNode("c", TextType.ITALIC),
+            ],
+            nodes,
+        )
+
+    # Test a link url is not broken up by delimiters inside it
+    def test_link_with_underscores(self):
+        nodes = text_to_textnodes("see [docs](https://example.com/a_b_c)")
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.NORMAL),
+                TextNode("docs", TextType.LINK, "https://example.com/a_b_c"),
+            ],
+            nodes,
+        )
+
+    # Test span nodes match copied nodes and point into the source
+    def test_text_to_spannodes(self):
+        for text in self.cases:
+            with self.subTest(text=text):
+                nodes = text_to_spannodes(text)
+                self.assertListEqual(text_to_textnodes(text), nodes)
+                for node in nodes:
+                    self.assertIs(node.source, text)
+
+    # Test with a non-string argument
+    def test_invalid_argument(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes(12345)
+        with self.assertRaises(ValueError):
+            text_to_spannodes(12345)
+
+    # Test a batch gives the same nodes as parsing each string alone
+    def test_batch_matches_single(self):
+        texts = self.cases + [
+            "unclosed **bold",
+            "closed on the next item**",
+            "_",
+            "a [link](https://example.com)",
+            "two\nlines with `code`",
+            "[not a link",
+            "](https://example.com)",
+        ]
+        self.assertListEqual([text_to_textnodes(text) for text in texts], text_to_textnodes_batch(texts))
+
+    # Test constructs never run across the boundary between two strings
+    def test_batch_does_not_cross_items(self):
+        self.assertListEqual(
+            [[TextNode("a **b", TextType.NORMAL)], [TextNode("c** d", TextType.NORMAL)]],
+            text_to_textnodes_batch(["a **b", "c** d"]),
+        )
+        self.assertListEqual([], text_to_textnodes_batch([]))
+
+    # Test the batch arguments are checked
+    def test_batch_invalid_argument(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes_batch("text")
+        with self.assertRaises(ValueError):
+            text_to_textnodes_batch(["text", 12345])
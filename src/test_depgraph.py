@@ -0,0 +1,129 @@
+import os
+import unittest
+
+from build import build_site, load_manifest, update_pages, why
+from depgraph import DependencyGraph, backlinks_node, page_inputs, page_linkers
+from template import load_template
+from sitetest import SiteTestCase
+
+
+class TestDependencyGraph(unittest.TestCase):
+
+    # Test changed inputs reach their users, and a changed source the users of its title and links
+    def test_affected(self):
+        graph = DependencyGraph({
+            "a.md": ["template", "source:a.md"],
+            "b.md": ["template", "source:b.md", "title:a.md", "links:a.md"],
+            "c.md": ["template", "source:c.md", "asset:/cat.png"],
+        })
+        self.assertEqual(graph.affected({"asset:/cat.png": "cat changed"}), {"c.md": "cat changed"})
+        self.assertEqual(graph.affected({"source:a.md": "a changed"}), {"a.md": "a changed", "b.md": "a changed"})
+        self.assertEqual(len(graph.affected({"template": "template changed"})), 3)
+
+        graph.set("b.md", ["template", "source:b.md"])
+        graph.remove("c.md")
+        self.assertEqual(graph.affected({"source:a.md": "a changed"}), {"a.md": "a changed"})
+        self.assertNotIn("asset:/cat.png", graph.users)
+        self.assertEqual(DependencyGraph(graph.to_dict()).to_dict(), graph.to_dict())
+
+    # Test resolving links to the pages they point at
+    def test_page_linkers(self):
+        pages = {
+            "index.md": {"output": "index.html", "links": [["link_text", "/blog/", "blog"], ["link_text", "#top", "top"]]},
+            os.path.join("blog", "index.md"): {"output": os.path.join("blog", "index.html"), "links": [
+                ["link_text", "../index.html", "home"], ["link_text", "post", "post"], ["link_text", "post.html", "again"],
+                ["image_text", "/index.html", "not a link"], ["link_text", "https://example.com/", "out"],
+            ]},
+            os.path.join("blog", "post.md"): {"output": os.path.join("blog", "post.html"), "links": []},
+        }
+        self.assertEqual(page_linkers(pages), {
+            "index.md": [os.path.join("blog", "index.md")],
+            os.path.join("blog", "index.md"): ["index.md"],
+            os.path.join("blog", "post.md"): [os.path.join("blog", "index.md")],
+        })
+
+    # Test the inputs of a page
+    def test_page_inputs(self):
+        entry = {"links": [["image_text", "/cat.png", "cat"], ["image_text", "https://example.com/dog.png", "dog"]]}
+        self.assertEqual(
+            page_inputs("a.md", entry, ["b.md"]),
+            {"template", "source:a.md", "asset:/cat.png", "title:b.md", "links:b.md"},
+        )
+
+    # Test rendering backlinks
+    def test_backlinks_node(self):
+        self.assertEqual(backlinks_node([]), "")
+        self.assertEqual(
+            backlinks_node([("Home", "/index.html")]).to_html(),
+            '<ul><li><a href="/index.html">Home</a></li></ul>',
+        )
+
+
+class TestIncrementalBacklinks(SiteTestCase):
+
+    TEMPLATE = "<h>{{ Title }}</h>{{ Content }}<nav>{{ Backlinks }}</nav>"
+    PAGES = {"a.md": "# Alpha\n\nSee [b](/b.html)\n", "b.md": "# Beta\n\nText\n", "c.md": "# Gamma\n\nText\n"}
+
+    def build(self):
+        result = build_site(self.content, self.output, self.template, workers=1)
+        return sorted(os.path.basename(path) for path in result.rendered)
+
+    # Test backlinks are right after the first build
+    def test_first_build(self):
+        self.assertEqual(self.build(), ["a.html", "b.html", "c.html"])
+        self.assertEqual(self.read("b.html"), '<h>Beta</h><div><h1>Beta</h1><p>Text</p></div><nav><ul><li><a href="/a.html">Alpha</a></li></ul></nav>')
+        self.assertEqual(self.read("c.html"), "<h>Gamma</h><div><h1>Gamma</h1><p>Text</p></div><nav></nav>")
+
+    # Test only the pages whose backlinks change are rendered again
+    def test_transitive_rebuild(self):
+        self.build()
+
+        # Body edits of a linking page leave the linked page alone
+        self.write("a.md", "# Alpha\n\nSee [b](/b.html) again\n")
+        self.assertEqual(self.build(), ["a.html"])
+
+        # A new title shows up in the backlinks of the pages it links to
+        self.write("a.md", "# Alpha 2\n\nSee [b](/b.html) again\n")
+        self.assertEqual(self.build(), ["a.html", "b.html"])
+        self.assertIn(">Alpha 2</a>", self.read("b.html"))
+        reason, inputs = why(load_manifest(self.output), "b.md")
+        self.assertEqual(reason, "backlinks changed: a.md changed")
+        self.assertEqual(inputs, ["links:a.md", "source:b.md", "template", "title:a.md"])
+
+        # New and removed links update the pages they point at
+        self.write("c.md", "# Gamma\n\n[b](b.html) [a](a)\n")
+        self.assertEqual(self.build(), ["a.html", "b.html", "c.html"])
+        self.write("a.md", "# Alpha 2\n\nNo more links\n")
+        self.assertEqual(self.build(), ["a.html", "b.html"])
+        self.assertNotIn("Alpha", self.read("b.html"))
+
+        # So do removed pages
+        os.remove(os.path.join(self.content, "c.md"))
+        self.assertEqual(self.build(), ["a.html", "b.html"])
+        self.assertEqual(self.read("b.html"), "<h>Beta</h><div><h1>Beta</h1><p>Text</p></div><nav></nav>")
+        self.assertEqual(self.build(), [])
+
+    # Test without a Backlinks slot links do not make pages depend on each other
+    def test_without_backlinks(self):
+        with open(self.template, "w") as f:
+            f.write("{{ Content }}")
+        self.build()
+        self.write("a.md", "# Alpha 2\n\nSee [b](/b.html)\n")
+        self.assertEqual(self.build(), ["a.html"])
+        self.assertEqual(why(load_manifest(self.output), "b.md"), ("new page", ["source:b.md", "template"]))
+        with self.assertRaises(ValueError):
+            why(load_manifest(self.output), "missing.md")
+
+    # Test watch mode renders the same pages as a build would
+    def test_update_pages(self):
+        self.build()
+        manifest = load_manifest(self.output)
+        self.write("a.md", "# Alpha 2\n\nSee [b](/b.html)\n")
+        result = update_pages(self.content, self.output, load_template(self.template), manifest, ["a.md"])
+        self.assertEqual(sorted(os.path.basename(path) for path in result.rendered), ["a.html", "b.html"])
+        self.assertIn(">Alpha 2</a>", self.read("b.html"))
+        self.assertEqual(manifest["pages"]["b.md"]["reason"], "backlinks changed: a.md changed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
-from extractlinks import extract_markdown_images, extract_markdown_links
+from extractlinks import extract_markdown_images, extract_markdown_links, extract_markdown_inline, InlineMatch
+from textnode import TextType
 
 class TestExtract(unittest.TestCase):
     
@@ -78,4 +79,23 @@ class TestExtract(unittest.TestCase):
     def test_extract_markdown_images_with_link_in_text(self):
         matches = extract_markdown_images(
             "This is text with a ![coolpage.com/image](https://i.imgur.com/coolestpicever.png)")
-        self.assertListEqual([("coolpage.com/image", "https://i.imgur.com/coolestpicever.png")], matches)
\ No newline at end of file
+        self.assertListEqual([("coolpage.com/image", "https://i.imgur.com/coolestpicever.png")], matches)
+
+    def test_extract_markdown_links_skips_images(self):
+        matches = extract_markdown_links(
+            "An ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://example.com)")
+        self.assertListEqual([("link", "https://example.com")], matches)
+
+    def test_extract_markdown_inline(self):
+        text = "An ![image](https://i.imgur.com/zjjcJKZ.png) and a [link](https://example.com)"
+        matches = extract_markdown_inline(text)
+        self.assertListEqual(
+            [
+                InlineMatch(TextType.IMAGE, 3, 44, "image", "https://i.imgur.com/zjjcJKZ.png"),
+                InlineMatch(TextType.LINK, 51, 78, "link", "https://example.com"),
+            ], matches)
+        self.assertEqual(text[matches[1].start:matches[1].end], "[link](https://example.com)")
+
+    def test_extract_markdown_inline_with_incorrect_argument(self):
+        with self.assertRaises(ValueError):
+            extract_markdown_inline(12345)
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+from fileio import IOStage, IOStats, atomic_open, atomic_write
+
+
+class TestFileIO(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    # Test atomic writes create directories and replace the old file
+    def test_atomic_write(self):
+        path = self.path("a/b.html")
+        self.assertEqual(atomic_write(path, "héllo"), 6)
+        atomic_write(path, b"bytes")
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"bytes")
+        self.assertEqual(os.listdir(self.path("a")), ["b.html"])
+
+    # Test a failed write leaves the old file and no temporary file behind
+    def test_atomic_open_error(self):
+        path = self.path("page.html")
+        atomic_write(path, "old")
+        with self.assertRaises(RuntimeError):
+            with atomic_open(path) as f:
+                f.write("new")
+                raise RuntimeError("render failed")
+        with open(path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.tmp.name), ["page.html"])
+
+    # Test reads are returned in order while running ahead of the caller
+    def test_read_all(self):
+        paths = []
+        for i in range(10):
+            paths.append(self.path(f"{i}.md"))
+            atomic_write(paths[-1], f"page {i}")
+        with IOStage(threads=2, limit=3) as io:
+            texts = [future.result() for future in io.read_all(paths)]
+        self.assertEqual(texts, [f"page {i}" for i in range(10)])
+        self.assertEqual((io.stats.files_read, io.stats.bytes_read), (10, 60))
+
+    # Test running without threads gives the same results
+    def test_inline(self):
+        with IOStage(threads=0) as io:
+            io.write(self.path("a.md"), "# A")
+            self.assertEqual([future.result() for future in io.read_all([self.path("a.md")])], ["# A"])
+            io.write(self.path("missing/"), "x")
+            with self.assertRaises(OSError):
+                io.drain()
+
+    # Test queued writes are all completed by drain
+    def test_write_drain(self):
+        with IOStage(threads=2, limit=2) as io:
+            for i in range(5):
+                io.write(self.path(f"out/{i}.html"), f"<p>{i}</p>")
+            io.drain()
+            self.assertEqual(sorted(os.listdir(self.path("out"))), [f"{i}.html" for i in range(5)])
+            self.assertEqual((io.stats.files_written, io.stats.bytes_written), (5, 40))
+
+    # Test writing through a file object in the calling thread is counted
+    def test_write_to(self):
+        with IOStage(threads=0) as io:
+            io.write_to(self.path("out/page.html"), lambda f: f.write("<p>\xe9</p>"))
+            with open(self.path("out/page.html"), encoding="utf-8") as f:
+                self.assertEqual(f.read(), "<p>\xe9</p>")
+            self.assertEqual((io.stats.files_written, io.stats.bytes_written), (1, 9))
+            self.assertEqual(os.listdir(self.path("out")), ["page.html"])
+
+    # Test write errors surface from drain
+    def test_write_error(self):
+        atomic_write(self.path("file"), "")
+        io = IOStage()
+        io.write(self.path("file/page.html"), "x")
+        with self.assertRaises(OSError):
+            io.drain()
+        io.close()
+
+    # Test merging stats from several workers
+    def test_stats_merge(self):
+        total = IOStats()
+        for _ in range(2):
+            stats = IOStats()
+            stats.files_read = 3
+            stats.bytes_written = 1 << 20
+            stats.write_seconds = 0.5
+            total.merge(stats)
+        self.assertEqual((total.files_read, total.bytes_written, total.write_seconds), (6, 2 << 20, 1.0))
+        self.assertIn("2.0 MB in 1.00s (2.0 MB/s)", repr(total))
+
+    # Test with invalid arguments
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            IOStage(threads=-1)
+        with self.assertRaises(ValueError):
+            IOStage(limit=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
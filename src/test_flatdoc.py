@@ -0,0 +1,118 @@
+import io
+import unittest
+
+from textnode import TextNode, TextType
+from htmlnode import LeafNode, ParentNode
+from blocks import markdown_to_html_node
+from delimiter import text_to_textnodes
+from flatdoc import ELEMENT, NONE, FlatDocument
+
+
+MARKDOWN = """# Title with **bold**
+
+A paragraph with _italic_, `code`, a [link](https://example.com/a_b) and ![an image](/cat.png).
+
+- first
+- [link](https://example.com/a_b) again
+
+1. one
+2. two
+
+> a quote
+> over two lines
+
+```
+code block
+```
+"""
+
+
+class TestFlatDocument(unittest.TestCase):
+
+    # Test the flat document renders like the node tree
+    def test_from_markdown_matches_nodes(self):
+        for markdown in (MARKDOWN, "", "plain", "- ``", "```one```"):
+            with self.subTest(markdown=markdown):
+                expected = markdown_to_html_node(markdown).to_html()
+                self.assertEqual(expected, FlatDocument.from_markdown(markdown).to_html())
+                self.assertEqual(expected, FlatDocument.from_markdown(markdown, text_to_textnodes).to_html())
+
+    # Test urls are stored once however often they are used
+    def test_urls_interned(self):
+        document = FlatDocument.from_markdown(MARKDOWN)
+        self.assertEqual(["https://example.com/a_b", "/cat.png"], document.urls)
+
+    # Test the arrays describe the tree
+    def test_tree_arrays(self):
+        document = FlatDocument.from_markdown("# Hi\n\n- a\n- b")
+        self.assertEqual(ELEMENT, document.kind[0])
+        self.assertEqual(NONE, document.parent[0])
+        blocks = list(document.children(0))
+        self.assertEqual(["h1", "ul"], [document.tags[document.tag[node]] for node in blocks])
+        items = list(document.children(blocks[1]))
+        self.assertEqual([blocks[1], blocks[1]], [document.parent[item] for item in items])
+        self.assertEqual([["a"], ["b"]], [[node.text for node in document.to_textnodes(item)] for item in items])
+
+    # Test converting to node objects and back
+    def test_html_node_round_trip(self):
+        node = markdown_to_html_node(MARKDOWN)
+        document = FlatDocument.from_html_node(node)
+        self.assertEqual(node.to_html(), document.to_html())
+        self.assertEqual(node.to_html(), document.to_html_node().to_html())
+        self.assertEqual(node.to_html(), FlatDocument.from_markdown(MARKDOWN).to_html_node().to_html())
+
+    # Test props on elements and leaves are kept
+    def test_props(self):
+        node = ParentNode("div", [LeafNode("span", "x", {"class": "a"}), LeafNode(None, "y")], {"id": "main"})
+        document = FlatDocument.from_html_node(node)
+        self.assertEqual('<div id="main"><span class="a">x</span>y</div>', document.to_html())
+        self.assertEqual(node.to_html(), document.to_html_node().to_html())
+
+    # Test props equal as values but rendering differently are interned apart
+    def test_props_equal_values(self):
+        node = ParentNode("p", [LeafNode("a", "x", {"x": 1}), LeafNode("a", "x", {"x": True})])
+        self.assertEqual(node.to_html(), FlatDocument.from_html_node(node).to_html())
+
+    # Test TextNodes converted in and out
+    def test_textnodes_round_trip(self):
+        nodes = text_to_textnodes("a **b** [c](d) ![e](f)")
+        document = FlatDocument.from_textnodes(nodes)
+        self.assertListEqual(nodes, document.to_textnodes())
+        self.assertEqual('a <b>b</b> <a href="d">c</a> <img src="f" alt="e"></img>', document.to_html())
+
+    # Test nesting deeper than the recursion limit renders
+    def test_deep_nesting(self):
+        document = FlatDocument()
+        for _ in range(5000):
+            document.open_element("div")
+        document.add_text("x", TextType.NORMAL)
+        for _ in range(5000):
+            document.close_element()
+        self.assertEqual("<div>" * 5000 + "x" + "</div>" * 5000, document.to_html())
+
+    # Test writing to a file object
+    def test_write_html(self):
+        fp = io.StringIO()
+        FlatDocument.from_markdown(MARKDOWN).write_html(fp)
+        self.assertEqual(markdown_to_html_node(MARKDOWN).to_html(), fp.getvalue())
+
+    # Test invalid construction
+    def test_invalid(self):
+        document = FlatDocument()
+        with self.assertRaises(ValueError):
+            document.close_element()
+        with self.assertRaises(ValueError):
+            document.open_element("")
+        document.open_element("p")
+        with self.assertRaises(ValueError):
+            document.close_element()
+        with self.assertRaises(ValueError):
+            document.add_text("x", "bold")
+        with self.assertRaises(ValueError):
+            FlatDocument.from_html_node(ParentNode("div", []))
+        with self.assertRaises(ValueError):
+            FlatDocument.from_textnodes([TextNode("x", TextType.BOLD)]).to_html_node(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
+import io
+import struct
+import sys
 import unittest
+from unittest import mock
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, SpanLeafNode, props_items
 
 class TestHTMLNode(unittest.TestCase):
 
@@ -46,6 +50,40 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(None, None, None, {"href": "https://www.google.com", "target": "_blank", "class": "my-class"})
         self.assertEqual(node.props_to_html(), ' href="https://www.google.com" target="_blank" class="my-class"')
 
+    # Test props_to_html escapes attribute values
+    def test_props_to_html_escapes_values(self):
+        node = HTMLNode(None, None, None, {"href": 'https://example.com/?a=1&b="2"', "alt": "<img>"})
+        self.assertEqual(node.props_to_html(), ' href="https://example.com/?a=1&amp;b=&quot;2&quot;" alt="&lt;img&gt;"')
+
+    # Test props_to_html follows changes to props
+    def test_props_to_html_after_change(self):
+        node = HTMLNode(None, None, None, {"href": "https://www.google.com"})
+        self.assertEqual(node.props_to_html(), ' href="https://www.google.com"')
+        node.props["href"] = "https://example.com"
+        self.assertEqual(node.props_to_html(), ' href="https://example.com"')
+        node.props = {"class": "my-class"}
+        self.assertEqual(node.props_to_html(), ' class="my-class"')
+
+    # Test props_to_html with an unhashable value
+    def test_props_to_html_unhashable_value(self):
+        node = HTMLNode(None, None, None, {"data-list": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), ' data-list="[&#x27;a&#x27;, &#x27;b&#x27;]"')
+
+    # Test props are normalized to the strings they render to
+    def test_props_items(self):
+        self.assertEqual(props_items({"x": 1, "y": True}), (("x", "1"), ("y", "True")))
+        self.assertIsNone(props_items({}))
+        self.assertIsNone(props_items(None))
+
+    # Test props equal as values but rendering differently are not mixed up by the caches
+    def test_props_to_html_equal_values(self):
+        self.assertEqual(LeafNode("a", "x", {"x": 1}).props_to_html(), ' x="1"')
+        self.assertEqual(LeafNode("a", "x", {"x": True}).props_to_html(), ' x="True"')
+        node = LeafNode("a", "x", {"x": 1})
+        self.assertEqual(node.props_to_html(), ' x="1"')
+        node.props = {"x": True}
+        self.assertEqual(node.props_to_html(), ' x="True"')
+
     # Test __repr__ method
     def test_repr(self):
         node = HTMLNode("div", "Hello, World!", ["child1", "child2"], {"class": "my-class"})
@@ -171,5 +209,76 @@ class TestHTMLNode(unittest.TestCase):
             '<article class="root"><h1>title</h1><section class="level2"><span>sibling</span></section><div class="level3"><em>very deep</em></div><footer>the end</footer></article>'
         )
 
+    #Test iter_html yields the same HTML as to_html in chunks
+    def test_iter_html(self):
+        root = ParentNode("div", [LeafNode("b", "bold"), ParentNode("p", [LeafNode(None, "text")])])
+        chunks = list(root.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), root.to_html())
+
+    #Test write_html writes to a file-like object
+    def test_write_html(self):
+        root = ParentNode("div", [LeafNode("a", "link", {"href": "https://example.com"})])
+        buffer = io.StringIO()
+        root.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), '<div><a href="https://example.com">link</a></div>')
+
+    #Test write_html on a leaf
+    def test_leaf_write_html(self):
+        buffer = io.StringIO()
+        LeafNode("span", "leaf").write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<span>leaf</span>")
+
+    #Test iter_html raises on invalid nodes
+    def test_iter_html_no_children(self):
+        with self.assertRaises(ValueError):
+            list(ParentNode("div", []).iter_html())
+
+    #Test rendering a tree deeper than the recursion limit
+    def test_to_html_deeper_than_recursion_limit(self):
+        depth = 5000
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("div", [node, LeafNode(None, "x")])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * depth + "<b>deep</b>" + "x</div>" * depth)
+
+    #Test nodes have no per-instance __dict__
+    def test_slots(self):
+        for node in (HTMLNode("div"), LeafNode("b", "bold"), ParentNode("div", [LeafNode("b", "bold")])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    #Test SpanLeafNode renders its span of the source
+    def test_span_leaf_node(self):
+        source = "some bold text"
+        node = SpanLeafNode("b", source, 5, 9)
+        self.assertEqual(node.value, "bold")
+        self.assertEqual(node.to_html(), "<b>bold</b>")
+        buffer = io.StringIO()
+        ParentNode("p", [SpanLeafNode(None, source, 0, 5), node]).write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<p>some <b>bold</b></p>")
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<p>some <b>bold</b></p><b>bold</b>")
+
+    #Test a SpanLeafNode adds only its offsets to a LeafNode, the source takes the value slot
+    def test_span_leaf_node_size(self):
+        self.assertEqual(sys.getsizeof(SpanLeafNode("b", "bold", 0, 4)), sys.getsizeof(LeafNode("b", "bold")) + 2 * struct.calcsize("P"))
+
+    #Test a SpanLeafNode inside a parent is written as chunks, not formatted by to_html
+    def test_span_leaf_node_in_parent(self):
+        source = "some bold text"
+        root = ParentNode("div", [ParentNode("p", [SpanLeafNode(None, source, 0, 5), SpanLeafNode("b", source, 5, 9)])])
+        buffer = io.StringIO()
+        with mock.patch.object(SpanLeafNode, "to_html", side_effect=AssertionError("span formatted by to_html")):
+            root.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<div><p>some <b>bold</b></p></div>")
+        self.assertIn("bold", list(root.iter_html()))
+        self.assertEqual(root.to_html(), "<div><p>some <b>bold</b></p></div>")
+
+    #Test SpanLeafNode without a value
+    def test_span_leaf_node_no_value(self):
+        with self.assertRaises(ValueError):
+            SpanLeafNode("b", None, 0, 0).to_html()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
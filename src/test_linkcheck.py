@@ -0,0 +1,83 @@
+import os
+import unittest
+
+from build import build_site, load_manifest, update_pages
+from delimiter import text_to_textnodes
+from linkcheck import LinkCollector, check_links, is_external, link_target
+from template import Template
+from sitetest import SiteTestCase
+
+
+class TestLinkCheck(SiteTestCase):
+
+    PAGES = {
+        "index.md": "# Home\n\n[post](/blog/post) [about](about.html) ![logo](/logo.png)\n\n[gone](/gone.html)\n",
+        "blog/post.md": "# Post\n\n[home](../index.html#top) [top](#top) [blog](/blog/) [site](https://example.com)\n",
+        "blog/index.md": "# Blog\n\n[out](../../etc/passwd) [mail](mailto:me@example.com)\n",
+    }
+
+    # Test telling external URLs from site paths
+    def test_is_external(self):
+        for url in ("https://example.com", "mailto:me@example.com", "//cdn.example.com/a.js"):
+            self.assertTrue(is_external(url), url)
+        for url in ("/blog/", "post.html", "#top", "../index.html?x=1"):
+            self.assertFalse(is_external(url), url)
+
+    # Test resolving internal URLs against the page using them
+    def test_link_target(self):
+        page = os.path.join("blog", "post.html")
+        self.assertEqual(link_target(page, "#top"), "blog/post.html")
+        self.assertEqual(link_target(page, "other.html"), "blog/other.html")
+        self.assertEqual(link_target(page, "../index.html#top"), "index.html")
+        self.assertEqual(link_target(page, "/"), "index.html")
+        self.assertEqual(link_target(page, "/blog/"), "blog/index.html")
+        self.assertEqual(link_target(page, "/my%20file.png"), "my file.png")
+        self.assertIsNone(link_target(page, "../../secret"))
+
+    # Test collecting links and images from an inline parser
+    def test_link_collector(self):
+        collector = LinkCollector(text_to_textnodes)
+        nodes = collector("A [link](/a) and ![img](/b.png)")
+        self.assertEqual(nodes, text_to_textnodes("A [link](/a) and ![img](/b.png)"))
+        collector("`[not](/c)`")
+        self.assertEqual(collector.pop(), [["link_text", "/a", "link"], ["image_text", "/b.png", "img"]])
+        self.assertEqual(collector.pop(), [])
+
+    # Test the build records links in the manifest and the checker validates them
+    def test_check_links(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        manifest = load_manifest(self.output)
+        self.assertEqual(manifest["pages"]["index.md"]["links"][0], ["link_text", "/blog/post", "post"])
+
+        report = check_links(manifest, self.output)
+        self.assertEqual(report.checked, 10)
+        self.assertEqual(report.broken, [
+            (os.path.join("blog", "index.md"), "../../etc/passwd", "out"),
+            ("index.md", "about.html", "about"),
+            ("index.md", "/logo.png", "logo"),
+            ("index.md", "/gone.html", "gone"),
+        ])
+        self.assertEqual(report.external, {
+            "mailto:me@example.com": [os.path.join("blog", "index.md")],
+            "https://example.com": [os.path.join("blog", "post.md")],
+        })
+
+        # Skipped pages keep their links, re-rendered ones replace them
+        self.write("about.md", "# About\n")
+        self.write("index.md", "# Home\n\n[about](about.html)\n")
+        build_site(self.content, self.output, self.template, workers=2)
+        manifest = load_manifest(self.output)
+        self.assertEqual(len(manifest["pages"][os.path.join("blog", "post.md")]["links"]), 4)
+        self.assertEqual(len(check_links(manifest, self.output).broken), 1)
+
+    # Test watch mode updates the links of the pages it renders
+    def test_update_pages_links(self):
+        build_site(self.content, self.output, self.template, workers=1)
+        manifest = load_manifest(self.output)
+        self.write("index.md", "# Home\n")
+        update_pages(self.content, self.output, Template("{{ Content }}"), manifest, ["index.md"])
+        self.assertEqual(manifest["pages"]["index.md"]["links"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
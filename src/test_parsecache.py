@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from textnode import TextNode, TextType
+from delimiter import text_to_textnodes
+import parsecache
+from parsecache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+
+    # Test results match text_to_textnodes
+    def test_same_result(self):
+        cache = ParseCache()
+        text = "This is **bold** and a [link](https://example.com)"
+        self.assertListEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        self.assertListEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    # Test callers get fresh nodes they can modify
+    def test_fresh_nodes(self):
+        cache = ParseCache()
+        first = cache.text_to_textnodes("plain")
+        first[0].text = "changed"
+        self.assertListEqual(cache.text_to_textnodes("plain"), [TextNode("plain", TextType.NORMAL)])
+
+    # Test the least recently used entry is evicted
+    def test_lru_bound(self):
+        cache = ParseCache(maxsize=2)
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("b")
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("c")
+        self.assertEqual(len(cache), 2)
+        cache.text_to_textnodes("a")
+        cache.text_to_textnodes("b")
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    # Test entries persist in the disk store
+    def test_disk_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+            text = "An ![image](https://i.imgur.com/zjjcJKZ.png) and `code`"
+            with ParseCache(path=path) as cache:
+                cache.text_to_textnodes(text)
+            with ParseCache(path=path) as cache:
+                self.assertListEqual(cache.text_to_textnodes(text), text_to_textnodes(text))
+                self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    # Test caches sharing a disk store hold no lock between flushes
+    def test_disk_store_shared(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+            with ParseCache(path=path) as first, ParseCache(path=path) as second:
+                first.text_to_textnodes("one")
+                self.assertFalse(first._db.in_transaction)
+                second.text_to_textnodes("two")
+                second.flush()
+                self.assertFalse(second._db.in_transaction)
+            with ParseCache(path=path) as cache:
+                cache.text_to_textnodes("one")
+                cache.text_to_textnodes("two")
+                self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    # Test a disk store written by another parser version is cleared
+    def test_disk_store_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite")
+            with ParseCache(path=path) as cache:
+                cache.text_to_textnodes("some **text**")
+            with mock.patch.object(parsecache, "PARSER_VERSION", parsecache.PARSER_VERSION + 1):
+                with ParseCache(path=path) as cache:
+                    cache.text_to_textnodes("some **text**")
+                    self.assertEqual((cache.hits, cache.misses), (0, 1))
+                with ParseCache(path=path) as cache:
+                    cache.text_to_textnodes("some **text**")
+                    self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    # Test invalid arguments
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ParseCache(maxsize=0)
+        with self.assertRaises(ValueError):
+            ParseCache().text_to_textnodes(12345)
+
+
+if __name__ == "__main__":
+    unittest.main()
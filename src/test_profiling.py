@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+import profiling
+from profiling import Profiler, instrument
+from delimiter import text_to_textnodes
+from blocks import markdown_to_html_node
+from build import build_site
+
+
+class TestProfiling(unittest.TestCase):
+
+    def tearDown(self):
+        profiling.disable()
+
+    # Test instrumented functions record calls and nodes only while enabled
+    def test_instrument(self):
+        text_to_textnodes("not recorded")
+        profiler = profiling.enable()
+        text_to_textnodes("This is **bold** text")
+        profiling.disable()
+        text_to_textnodes("not recorded")
+        seconds, calls, nodes = profiler.totals["parse"]
+        self.assertEqual((calls, nodes), (1, 3))
+        self.assertGreaterEqual(seconds, 0)
+
+    # Test conversion is recorded once per inline text, counting the nodes it made
+    def test_convert(self):
+        profiler = profiling.enable()
+        markdown_to_html_node("This is **bold** text\n\n- a\n- _b_")
+        self.assertEqual(profiler.totals["convert"][1:], [3, 5])
+
+    # Test a decorated function keeps its name and result
+    def test_instrument_wraps(self):
+        @instrument("double", count=len)
+        def double(items):
+            return items * 2
+        self.assertEqual(double.__name__, "double")
+        profiler = profiling.enable()
+        self.assertEqual(double([1]), [1, 1])
+        self.assertEqual(profiler.totals["double"][1:], [1, 2])
+
+    # Test per-page measurements are kept apart and added to the totals
+    def test_pages(self):
+        profiler = Profiler()
+        profiler.record("scan", 1.0)
+        profiler.start_page("a.md")
+        profiler.record("parse", 0.5, 4)
+        profiler.record("parse", 0.25, 2)
+        page = profiler.pop_page()
+        self.assertEqual(page[0], "a.md")
+        self.assertNotIn("parse", profiler.totals)
+        profiler.add_page(*page)
+        self.assertEqual(profiler.totals["parse"], [0.75, 2, 6])
+        self.assertEqual(profiler.slowest_pages(), [("a.md", profiler.pages["a.md"])])
+        self.assertIn("a.md", profiler.report())
+        data = profiler.to_dict()
+        self.assertEqual(data["pages"]["a.md"]["stages"]["parse"], {"seconds": 0.75, "calls": 2, "nodes": 6})
+        self.assertEqual(data["totals"]["scan"]["calls"], 1)
+
+    # Test a profiled build measures every page and dumps JSON
+    def test_profiled_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, name + ".md"), "w") as f:
+                    f.write(f"# {name}\n\nSome **text**\n")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+
+            profiler = Profiler()
+            build_site(content, os.path.join(tmp, "public"), template, workers=1, profile=profiler)
+            self.assertEqual(len(profiler.pages), 2)
+            for stage in ("read", "blocks", "parse", "convert", "render", "write"):
+                self.assertGreater(profiler.totals[stage][1], 0, stage)
+            self.assertIsNone(profiling.active())
+            self.assertEqual(profiler.io.files_written, 2)
+            self.assertIn("I/O threads: read 2 files", profiler.report())
+
+            path = os.path.join(tmp, "profile.json")
+            profiler.dump(path)
+            with open(path) as f:
+                data = json.load(f)
+            self.assertEqual(len(data["pages"]), 2)
+            self.assertEqual(data["io"]["files_read"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
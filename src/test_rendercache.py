@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from blocks import BlockType, markdown_to_html_node
+from build import build_site, load_manifest
+from linkcheck import LinkCollector
+from delimiter import text_to_textnodes
+from rendercache import RenderCache, node_digest, node_key
+
+
+MARKDOWN = """# Title
+
+- [Home](/index.html)
+- [Blog](/blog/)
+
+> **Note:** see ![logo](/logo.png)
+
+Some _text_
+"""
+
+
+def nav(href="/"):
+    return ParentNode("ul", [ParentNode("li", [LeafNode("a", "Home", {"href": href})]), ParentNode("li", [LeafNode(None, "x")])])
+
+
+class TestRenderCache(unittest.TestCase):
+
+    # Test keys follow structure, not identity
+    def test_node_key(self):
+        self.assertEqual(node_key(nav()), node_key(nav()))
+        self.assertEqual(node_digest(nav()), node_digest(nav()))
+        self.assertNotEqual(node_key(nav()), node_key(nav("/other")))
+        self.assertNotEqual(node_digest(nav()), node_digest(ParentNode("ol", nav().children)))
+        self.assertNotEqual(node_key(LeafNode("b", "x")), node_key(LeafNode("i", "x")))
+
+    # Test keying a tree deeper than the recursion limit
+    def test_node_key_deep(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("div", [node])
+        self.assertEqual(node_digest(node), node_digest(node))
+
+    # Test a repeated node is rendered once and spliced in after
+    def test_fragment_html(self):
+        cache = RenderCache()
+        self.assertEqual(nav().to_html(), cache.fragment_html(nav()))
+        self.assertEqual(nav().to_html(), cache.fragment_html(nav()))
+        self.assertEqual(nav("/a").to_html(), cache.fragment_html(nav("/a")))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+    # Test props are keyed by how they render: unhashable values work, equal values like 1 and True differ
+    def test_fragment_props(self):
+        cache = RenderCache()
+        node = ParentNode("p", [LeafNode("span", "x", {"data": ["a"]})])
+        self.assertEqual(node.to_html(), cache.fragment_html(node))
+        self.assertEqual('<p><a x="1">x</a></p>', cache.fragment_html(ParentNode("p", [LeafNode("a", "x", {"x": 1})])))
+        self.assertEqual('<p><a x="True">x</a></p>', cache.fragment_html(ParentNode("p", [LeafNode("a", "x", {"x": True})])))
+        self.assertNotEqual(node_key(LeafNode(None, 1)), node_key(LeafNode(None, True)))
+
+    # Test a node without children raises the renderer's error
+    def test_fragment_no_children(self):
+        with self.assertRaises(ValueError):
+            RenderCache().fragment_html(ParentNode("div", []))
+
+    # Test cached markdown renders like the node tree, the second time from the cache
+    def test_iter_markdown_html(self):
+        cache = RenderCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(expected, "".join(cache.iter_markdown_html(MARKDOWN)))
+        self.assertEqual(expected, "".join(cache.iter_markdown_html(MARKDOWN)))
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+        self.assertEqual("<div></div>", "".join(cache.iter_markdown_html("")))
+
+    # Test links of a cached block are recorded again
+    def test_block_links(self):
+        cache = RenderCache()
+        links = LinkCollector(text_to_textnodes)
+        lines = ["- [Home](/index.html)", "- [Blog](/blog/)"]
+        for _ in range(2):
+            cache.block_html(BlockType.UNORDERED_LIST, lines, links, links)
+            self.assertEqual([url for _, url, _ in links.pop()], ["/index.html", "/blog/"])
+        self.assertEqual(cache.hits, 1)
+
+    # Test the cache stays within its bounds
+    def test_bounds(self):
+        cache = RenderCache(maxsize=2)
+        for text in ("a", "b", "c"):
+            cache.block_html(BlockType.PARAGRAPH, [text])
+        self.assertEqual(len(cache), 2)
+        cache = RenderCache(max_bytes=20)
+        cache.block_html(BlockType.PARAGRAPH, ["a" * 30])
+        cache.block_html(BlockType.PARAGRAPH, ["short"])
+        cache.block_html(BlockType.PARAGRAPH, ["other"])
+        self.assertEqual((len(cache), cache.size), (1, len("<p>other</p>")))
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    # Test invalid bounds
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            RenderCache(maxsize=0)
+        with self.assertRaises(ValueError):
+            RenderCache(max_bytes=0)
+
+    # Test a build records the links of blocks rendered from the cache
+    def test_build_links(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, name + ".md"), "w") as f:
+                    f.write(f"# {name}\n\n- [a](/a.html)\n- [b](/b.html)\n")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            output = os.path.join(tmp, "public")
+
+            build_site(content, output, template, workers=1)
+            pages = load_manifest(output)["pages"]
+            for name in ("a.md", "b.md"):
+                self.assertEqual([url for _, url, _ in pages[name]["links"]], ["/a.html", "/b.html"])
+            with open(os.path.join(output, "b.html")) as f:
+                self.assertEqual(f.read(), '<div><h1>b</h1><ul><li><a href="/a.html">a</a></li><li><a href="/b.html">b</a></li></ul></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
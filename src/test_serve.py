@@ -0,0 +1,110 @@
+import os
+import unittest
+
+from build import build_site, load_manifest
+from serve import InotifyWatcher, PollingWatcher, SiteWatcher, make_watcher
+from sitetest import SiteTestCase
+
+
+class TestSiteWatcher(SiteTestCase):
+
+    PAGES = {"index.md": "# Home\n", "blog/post.md": "# Post\n"}
+
+    def setUp(self):
+        super().setUp()
+        build_site(self.content, self.output, self.template, workers=1)
+
+    def check_watcher(self, polling):
+        watcher = SiteWatcher(self.content, self.output, self.template, interval=0.01, polling=polling)
+        try:
+            self.assertIsNone(watcher.poll(0.05))
+
+            self.write("blog/post.md", "# Changed\n")
+            result = watcher.poll(1)
+            self.assertEqual(result.rendered, [os.path.join(self.output, "blog", "post.html")])
+            self.assertEqual(self.read("blog/post.html"), "<div><h1>Changed</h1></div>")
+
+            self.write("new/page.md", "# New\n")
+            os.remove(os.path.join(self.content, "index.md"))
+            rendered, removed = [], []
+            for _ in range(10):
+                result = watcher.poll(0.2)
+                if result:
+                    rendered += result.rendered
+                    removed += result.removed
+                if rendered and removed:
+                    break
+            self.assertEqual(rendered, [os.path.join(self.output, "new", "page.html")])
+            self.assertEqual(self.read("new/page.html"), "<div><h1>New</h1></div>")
+            self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+        finally:
+            watcher.close()
+
+        # The manifest written on close lets the next build skip everything
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(result.rendered, [])
+
+    # Test watching by polling
+    def test_polling(self):
+        self.check_watcher(polling=True)
+
+    # Test watching with inotify
+    def test_inotify(self):
+        if not isinstance(make_watcher(self.content), InotifyWatcher):
+            self.skipTest("inotify is not available")
+        self.check_watcher(polling=False)
+
+    # Test a template change re-renders every page
+    def test_template_change(self):
+        watcher = SiteWatcher(self.content, self.output, self.template, interval=0.01, polling=True)
+        try:
+            with open(self.template, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            os.utime(self.template, ns=(0, 0))
+            result = watcher.poll(0.01)
+            self.assertEqual(len(result.rendered), 2)
+            self.assertEqual(self.read("index.html"), "<main><div><h1>Home</h1></div></main>")
+        finally:
+            watcher.close()
+
+    # Test a page that fails to render is logged, keeps its output and stays changed for the next build
+    def test_render_error(self):
+        messages = []
+        watcher = SiteWatcher(self.content, self.output, self.template, interval=0.01, polling=True, log=messages.append)
+        old_entry = dict(watcher.manifest["pages"]["index.md"])
+        try:
+            self.write("index.md", "no title here\n")
+            self.write("bad.md", "# Bad \xe9\n")
+            with open(os.path.join(self.content, "bad.md"), "ab") as f:
+                f.write(b"\xff")
+            result = watcher.poll(0.05)
+            self.assertEqual(result.rendered, [])
+            self.assertEqual(sorted(page for page, _ in result.errors), ["bad.md", "index.md"])
+            self.assertEqual(
+                [message.split(":")[0] for message in sorted(messages)], ["Cannot render bad.md", "Cannot render index.md"]
+            )
+            self.assertEqual(self.read("index.html"), "<div><h1>Home</h1></div>")
+
+            self.write("blog/post.md", "# Still served\n")
+            self.assertEqual(watcher.poll(1).rendered, [os.path.join(self.output, "blog", "post.html")])
+        finally:
+            watcher.close()
+
+        manifest = load_manifest(self.output)
+        self.assertEqual(manifest["pages"]["index.md"], old_entry)
+        self.assertNotIn("bad.md", manifest["pages"])
+        os.remove(os.path.join(self.content, "bad.md"))
+        self.write("index.md", "# Fixed\n")
+        result = build_site(self.content, self.output, self.template, workers=1)
+        self.assertEqual(result.rendered, [os.path.join(self.output, "index.html")])
+
+    # Test the polling watcher reports changed pages
+    def test_polling_watcher(self):
+        watcher = PollingWatcher(self.content, interval=0.01)
+        self.assertEqual(watcher.changes(0), set())
+        self.write("index.md", "# Home, longer\n")
+        self.assertEqual(watcher.changes(0), {"index.md"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+
+    # Test parsing into static chunks and slots
+    def test_parts(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertListEqual(
+            [("<title>", "Title"), ("</title><body>", "Content"), ("</body>", None)],
+            template.parts,
+        )
+        self.assertListEqual(["Title", "Content"], template.slots)
+
+    # Test rendering strings and nodes
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        content = ParentNode("div", [LeafNode("b", "bold")])
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": content}),
+            "<title>Home</title><body><div><b>bold</b></div></body>",
+        )
+
+    # Test streaming an iterable of nodes to a file-like object
+    def test_render_to_nodes(self):
+        template = Template("<main>{{ Content }}</main>")
+        buffer = io.StringIO()
+        template.render_to(buffer, {"Content": iter([LeafNode("p", "one"), LeafNode("p", "two")])})
+        self.assertEqual(buffer.getvalue(), "<main><p>one</p><p>two</p></main>")
+
+    # Test a template without slots
+    def test_no_slots(self):
+        template = Template("static")
+        self.assertEqual(template.slots, [])
+        self.assertEqual(template.render({}), "static")
+
+    # Test a missing slot value
+    def test_missing_value(self):
+        with self.assertRaises(ValueError):
+            Template("{{ Title }}").render({})
+
+    # Test with a non-string argument
+    def test_invalid_argument(self):
+        with self.assertRaises(ValueError):
+            Template(12345)
+
+    # Test templates are parsed once and again after a change
+    def test_load_template(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            os.utime(path, ns=(0, 0))
+            second = load_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.slots, ["Content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
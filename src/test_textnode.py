@@ -1,6 +1,9 @@
+import struct
+import sys
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import SpanTextNode, TextNode, TextType, text_node_to_html_node
+from htmlnode import SpanLeafNode
 
 
 class TestTextNode(unittest.TestCase):
@@ -106,5 +109,35 @@ class TestTextNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             text_node_to_html_node(node)
 
+    #test TextNode has no per-instance __dict__
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "value"
+
+    #test SpanTextNode reads its text from the source
+    def test_span_text_node(self):
+        node = SpanTextNode("This is **bold** text", 10, 14, TextType.BOLD)
+        self.assertEqual(node.text, "bold")
+        self.assertEqual(node, TextNode("bold", TextType.BOLD))
+        node.text = "changed"
+        self.assertEqual((node.source, node.start, node.end), ("changed", 0, 7))
+
+    #test a SpanTextNode adds only its offsets to a TextNode, the source takes the text slot
+    def test_span_text_node_size(self):
+        span = SpanTextNode("This is **bold** text", 10, 14, TextType.BOLD)
+        self.assertEqual(sys.getsizeof(span), sys.getsizeof(TextNode("bold", TextType.BOLD)) + 2 * struct.calcsize("P"))
+
+    #test text_node_to_html_node keeps spans as spans
+    def test_text_node_to_html_node_span(self):
+        source = "a [link](http://example.com) and ![img](http://example.com/i.png)"
+        link = text_node_to_html_node(SpanTextNode(source, 3, 7, TextType.LINK, "http://example.com"))
+        self.assertIsInstance(link, SpanLeafNode)
+        self.assertIs(link.source, source)
+        self.assertEqual(link.to_html(), '<a href="http://example.com">link</a>')
+        image = text_node_to_html_node(SpanTextNode(source, 35, 38, TextType.IMAGE, "http://example.com/i.png"))
+        self.assertEqual(image.props, {"src": "http://example.com/i.png", "alt": "img"})
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
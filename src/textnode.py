@@ -1,5 +1,5 @@
 from enum import Enum
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, SpanLeafNode
 
 class TextType(Enum):
     #Enumerator for text types
@@ -12,6 +12,8 @@ class TextType(Enum):
 
 class TextNode():
     #Enumerator for text nodes
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
@@ -26,10 +28,54 @@ class TextNode():
     
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
+
+class SpanTextNode(TextNode):
+    #A TextNode whose text is the span source[start:end] of a larger document.
+    #The text is sliced out only when it is read, so splitting a document into nodes copies nothing.
+    __slots__ = ("start", "end")
+
+    #The source is kept in the slot TextNode stores text in, so a span adds only its two offsets
+    source = TextNode.text
+
+    def __init__(self, source, start, end, text_type, url=None):
+        super().__init__(source, text_type, url)
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self):
+        return self.source[self.start:self.end]
+
+    @text.setter
+    def text(self, text):
+        self.source = text
+        self.start = 0
+        self.end = len(text)
+
+def _span_to_html_node(text_node):
+    #text_node_to_html_node for spans, the leaves keep pointing into the source
+    source, start, end = text_node.source, text_node.start, text_node.end
+    match text_node.text_type:
+        case TextType.NORMAL:
+            return SpanLeafNode(None, source, start, end)
+        case TextType.BOLD:
+            return SpanLeafNode("b", source, start, end)
+        case TextType.ITALIC:
+            return SpanLeafNode("i", source, start, end)
+        case TextType.CODE:
+            return SpanLeafNode("code", source, start, end)
+        case TextType.LINK:
+            return SpanLeafNode("a", source, start, end, {"href": text_node.url})
+        case TextType.IMAGE:
+            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        case _:
+            raise ValueError("Invalid text type")
     
 def text_node_to_html_node(text_node):
         if text_node.text_type is None:
             raise ValueError("TextNode must have a text type")
+        if isinstance(text_node, SpanTextNode):
+            return _span_to_html_node(text_node)
         match text_node.text_type:
             case TextType.NORMAL:
                 return LeafNode(None, text_node.text)